@@ -0,0 +1,28 @@
+"""Add generated max_hp column to characters
+
+Revision ID: 002_character_max_hp
+Revises: 001_initial
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '002_character_max_hp'
+down_revision: Union[str, None] = '001_initial'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'characters',
+        sa.Column('max_hp', sa.Integer, sa.Computed('100 + endurance * 5', persisted=True)),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('characters', 'max_hp')
@@ -0,0 +1,30 @@
+"""Add partial index on displayed user badges
+
+Revision ID: 003_user_badge_displayed
+Revises: 002_character_max_hp
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '003_user_badge_displayed'
+down_revision: Union[str, None] = '002_character_max_hp'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_user_badge_displayed',
+        'user_badges',
+        ['user_id', 'display_position'],
+        postgresql_where=sa.text('is_displayed = true'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_user_badge_displayed', table_name='user_badges')
@@ -0,0 +1,42 @@
+"""Add composite indexes for combat lookups
+
+Revision ID: 004_combat_lookup_indexes
+Revises: 003_user_badge_displayed
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '004_combat_lookup_indexes'
+down_revision: Union[str, None] = '003_user_badge_displayed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_combats_challenger_status_created',
+        'combats',
+        ['challenger_id', 'status', 'created_at'],
+    )
+    op.create_index(
+        'idx_combats_defender_status_created',
+        'combats',
+        ['defender_id', 'status', 'created_at'],
+    )
+    op.create_index(
+        'idx_combats_pending_pair',
+        'combats',
+        ['challenger_id', 'defender_id'],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_combats_pending_pair', table_name='combats')
+    op.drop_index('idx_combats_defender_status_created', table_name='combats')
+    op.drop_index('idx_combats_challenger_status_created', table_name='combats')
@@ -0,0 +1,41 @@
+"""Add denormalized active_habits_count to users
+
+Revision ID: 005_user_active_habits_count
+Revises: 004_combat_lookup_indexes
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '005_user_active_habits_count'
+down_revision: Union[str, None] = '004_combat_lookup_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column('active_habits_count', sa.Integer, server_default='0', nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE users
+        SET active_habits_count = counts.total
+        FROM (
+            SELECT user_id, count(*) AS total
+            FROM habits
+            WHERE NOT is_archived
+            GROUP BY user_id
+        ) AS counts
+        WHERE users.id = counts.user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'active_habits_count')
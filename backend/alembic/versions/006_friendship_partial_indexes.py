@@ -0,0 +1,44 @@
+"""Add partial keyset indexes for accepted and pending friendships
+
+Revision ID: 006_friendship_partial_indexes
+Revises: 005_user_active_habits_count
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '006_friendship_partial_indexes'
+down_revision: Union[str, None] = '005_user_active_habits_count'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_friendships_requester_accepted',
+        'friendships',
+        ['requester_id', 'created_at', 'id'],
+        postgresql_where=sa.text("status = 'accepted'"),
+    )
+    op.create_index(
+        'idx_friendships_addressee_accepted',
+        'friendships',
+        ['addressee_id', 'created_at', 'id'],
+        postgresql_where=sa.text("status = 'accepted'"),
+    )
+    op.create_index(
+        'idx_friendships_addressee_pending',
+        'friendships',
+        ['addressee_id', 'created_at', 'id'],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_friendships_addressee_pending', table_name='friendships')
+    op.drop_index('idx_friendships_addressee_accepted', table_name='friendships')
+    op.drop_index('idx_friendships_requester_accepted', table_name='friendships')
@@ -0,0 +1,40 @@
+"""Replace the plain friend_code index with a partial unique index on active users
+
+Revision ID: 007_user_friend_code_active
+Revises: 006_friendship_partial_indexes
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '007_user_friend_code_active'
+down_revision: Union[str, None] = '006_friendship_partial_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        UPDATE users
+        SET friend_code = upper(friend_code)
+        WHERE friend_code <> upper(friend_code)
+        """
+    )
+    op.drop_index('ix_users_friend_code', table_name='users')
+    op.create_index(
+        'idx_users_friend_code_active',
+        'users',
+        ['friend_code'],
+        unique=True,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_users_friend_code_active', table_name='users')
+    op.create_index('ix_users_friend_code', 'users', ['friend_code'])
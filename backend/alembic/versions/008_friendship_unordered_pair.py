@@ -0,0 +1,43 @@
+"""Enforce one friendship per unordered user pair
+
+Revision ID: 008_friendship_unordered_pair
+Revises: 007_user_friend_code_active
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '008_friendship_unordered_pair'
+down_revision: Union[str, None] = '007_user_friend_code_active'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Racing requests could leave A->B and B->A rows; keep the oldest one
+    op.execute(
+        """
+        DELETE FROM friendships AS newer
+        USING friendships AS older
+        WHERE newer.requester_id = older.addressee_id
+          AND newer.addressee_id = older.requester_id
+          AND (newer.created_at, newer.id) > (older.created_at, older.id)
+        """
+    )
+    op.create_index(
+        'idx_friendships_unordered_pair',
+        'friendships',
+        [
+            sa.text('LEAST(requester_id, addressee_id)'),
+            sa.text('GREATEST(requester_id, addressee_id)'),
+        ],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_friendships_unordered_pair', table_name='friendships')
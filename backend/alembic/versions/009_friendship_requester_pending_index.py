@@ -0,0 +1,30 @@
+"""Add partial keyset index for outgoing pending friend requests
+
+Revision ID: 009_friendship_requester_pending
+Revises: 008_friendship_unordered_pair
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '009_friendship_requester_pending'
+down_revision: Union[str, None] = '008_friendship_unordered_pair'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_friendships_requester_pending',
+        'friendships',
+        ['requester_id', 'created_at', 'id'],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_friendships_requester_pending', table_name='friendships')
@@ -0,0 +1,36 @@
+"""Extend the completions (user_id, completed_date) index with habit_id
+
+Revision ID: 010_completion_user_date_habit
+Revises: 009_friendship_requester_pending
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '010_completion_user_date_habit'
+down_revision: Union[str, None] = '009_friendship_requester_pending'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_completions_user_date_habit',
+        'completions',
+        ['user_id', 'completed_date', 'habit_id'],
+    )
+    # Same leading columns, so the old index is redundant
+    op.drop_index('ix_completions_user_date', table_name='completions')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'ix_completions_user_date',
+        'completions',
+        ['user_id', 'completed_date'],
+    )
+    op.drop_index('idx_completions_user_date_habit', table_name='completions')
@@ -0,0 +1,32 @@
+"""Index the inventory equipped and item category filters
+
+Revision ID: 011_inventory_filter_indexes
+Revises: 010_completion_user_date_habit
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '011_inventory_filter_indexes'
+down_revision: Union[str, None] = '010_completion_user_date_habit'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Declared on the models but never created by a migration
+    op.create_index(
+        'idx_inventory_equipped',
+        'user_inventory',
+        ['user_id', 'is_equipped'],
+    )
+    op.create_index('idx_items_category', 'items', ['category'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_items_category', table_name='items')
+    op.drop_index('idx_inventory_equipped', table_name='user_inventory')
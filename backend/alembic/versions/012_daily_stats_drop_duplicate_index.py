@@ -0,0 +1,26 @@
+"""Drop the daily_stats index duplicating its unique constraint
+
+Revision ID: 012_daily_stats_duplicate_index
+Revises: 011_inventory_filter_indexes
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '012_daily_stats_duplicate_index'
+down_revision: Union[str, None] = '011_inventory_filter_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # uq_daily_stats is already a unique btree on (user_id, date)
+    op.drop_index('ix_daily_stats_user_date', table_name='daily_stats')
+
+
+def downgrade() -> None:
+    op.create_index('ix_daily_stats_user_date', 'daily_stats', ['user_id', 'date'])
@@ -2,19 +2,34 @@
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import NullPool
 
 from app.config import get_settings
 
 settings = get_settings()
 
 # Create async engine
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-)
+if settings.db_pgbouncer:
+    # PgBouncer owns pooling; asyncpg prepared statements don't survive
+    # transaction-mode connection swaps.
+    engine = create_async_engine(
+        settings.database_url,
+        echo=settings.debug,
+        query_cache_size=settings.db_query_cache_size,
+        poolclass=NullPool,
+        connect_args={"statement_cache_size": 0},
+    )
+else:
+    engine = create_async_engine(
+        settings.database_url,
+        echo=settings.debug,
+        query_cache_size=settings.db_query_cache_size,
+        pool_pre_ping=True,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+    )
 
 # Create async session factory
 async_session_maker = async_sessionmaker(
@@ -32,7 +47,12 @@ class Base(DeclarativeBase):
 
 
 async def get_db() -> AsyncSession:
-    """Dependency to get database session."""
+    """Dependency to get database session.
+    
+    Pending changes are flushed by the commit once the endpoint returns,
+    so endpoints only need an explicit flush when they read back
+    generated values before then.
+    """
     async with async_session_maker() as session:
         try:
             yield session
@@ -14,22 +14,47 @@ from sqlalchemy.orm import selectinload
 
 from app.config import get_settings
 from app.database import get_db
+from app.models.character import Character
 from app.models.user import User
 
 settings = get_settings()
 security = HTTPBearer()
 
+# Character columns needed by the API responses; appearance layers are only
+# loaded on demand (see characters.preview_equipment).
+CHARACTER_LOAD_COLUMNS = (
+    Character.id,
+    Character.user_id,
+    Character.name,
+    Character.character_class,
+    Character.strength,
+    Character.intelligence,
+    Character.agility,
+    Character.endurance,
+    Character.charisma,
+    Character.unallocated_points,
+    Character.max_hp,
+    Character.equipped_weapon_id,
+    Character.equipped_armor_id,
+    Character.equipped_helmet_id,
+    Character.equipped_accessory_id,
+    Character.equipped_pet_id,
+    Character.created_at,
+    Character.updated_at,
+)
 
-async def get_current_user(
+
+async def get_current_user_id(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
-    db: Annotated[AsyncSession, Depends(get_db)],
-) -> User:
+) -> UUID:
     """
-    Validate JWT token and return the current user.
+    Validate JWT token and return the user id it was issued for.
+    
+    No database access; endpoints that only need the id (or a couple of
+    columns) can skip loading the full user.
     
     Raises:
         HTTPException 401: If token is invalid or expired
-        HTTPException 404: If user not found
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -61,11 +86,25 @@ async def get_current_user(
     except jwt.PyJWTError:
         raise credentials_exception
     
+    return UUID(user_id)
+
+
+async def get_current_user(
+    user_id: Annotated[UUID, Depends(get_current_user_id)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> User:
+    """
+    Validate JWT token and return the current user.
+    
+    Raises:
+        HTTPException 401: If token is invalid or expired
+        HTTPException 404: If user not found
+    """
     # Get user from database
     result = await db.execute(
         select(User)
-        .options(selectinload(User.character))
-        .where(User.id == UUID(user_id))
+        .options(selectinload(User.character).load_only(*CHARACTER_LOAD_COLUMNS))
+        .where(User.id == user_id)
         .where(User.deleted_at.is_(None))
     )
     user = result.scalar_one_or_none()
@@ -98,5 +137,6 @@ async def get_current_user_with_character(
 
 # Type aliases for cleaner dependency injection
 CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUserId = Annotated[UUID, Depends(get_current_user_id)]
 CurrentUserWithCharacter = Annotated[User, Depends(get_current_user_with_character)]
 DBSession = Annotated[AsyncSession, Depends(get_db)]
@@ -2,12 +2,26 @@
 
 import logging
 import sys
+from uuid import UUID
+
 import structlog
 from app.config import get_settings
 
 settings = get_settings()
 
 
+def stringify_uuids(logger, method_name: str, event_dict: dict) -> dict:
+    """Render UUID values as plain strings.
+    
+    Lets callers log ids as-is; the conversion only happens for events
+    that pass the level filter and actually get rendered.
+    """
+    for key, value in event_dict.items():
+        if isinstance(value, UUID):
+            event_dict[key] = str(value)
+    return event_dict
+
+
 def configure_logging() -> None:
     """Configure structlog for JSON output in production."""
     
@@ -19,6 +33,7 @@ def configure_logging() -> None:
         structlog.processors.TimeStamper(fmt="iso"),
         structlog.processors.StackInfoRenderer(),
         structlog.processors.UnicodeDecoder(),
+        stringify_uuids,
     ]
 
     if settings.environment == "production":
@@ -35,7 +50,10 @@ def configure_logging() -> None:
 
     structlog.configure(
         processors=processors,
-        wrapper_class=structlog.stdlib.BoundLogger,
+        # Calls below the configured level return before any processor runs
+        wrapper_class=structlog.make_filtering_bound_logger(
+            getattr(logging, settings.log_level.upper())
+        ),
         context_class=dict,
         logger_factory=structlog.PrintLoggerFactory(),
         cache_logger_on_first_use=True,
@@ -10,6 +10,7 @@ from prometheus_fastapi_instrumentator import Instrumentator
 
 from app.config import get_settings
 from app.database import close_db, engine
+from app.utils.redis_client import close_redis, get_redis
 
 settings = get_settings()
 
@@ -23,6 +24,7 @@ async def lifespan(app: FastAPI):
     # Shutdown
     print("Shutting down...")
     await close_db()
+    await close_redis()
 
 
 
@@ -70,7 +72,6 @@ async def health_check():
 @app.get("/api/health/detailed", tags=["Health"])
 async def health_detailed():
     """Detailed health check with DB and Redis status."""
-    from redis import asyncio as aioredis
     from sqlalchemy import text
 
     db_status = "healthy"
@@ -85,9 +86,7 @@ async def health_detailed():
 
     # Check Redis
     try:
-        redis = aioredis.from_url(settings.redis_url)
-        await redis.ping()
-        await redis.close()
+        await get_redis().ping()
     except Exception as e:
         redis_status = f"unhealthy: {str(e)}"
 
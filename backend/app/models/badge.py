@@ -14,6 +14,7 @@ from sqlalchemy import (
     String,
     Text,
     func,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB, UUID as PGUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -99,7 +100,15 @@ class UserBadge(Base):
     user: Mapped["User"] = relationship("User", back_populates="badges")
     badge: Mapped["Badge"] = relationship("Badge", back_populates="user_badges")
     
-    __table_args__ = (Index("idx_user_badges_user_id", "user_id"),)
+    __table_args__ = (
+        Index("idx_user_badges_user_id", "user_id"),
+        Index(
+            "idx_user_badge_displayed",
+            "user_id",
+            "display_position",
+            postgresql_where=text("is_displayed = true"),
+        ),
+    )
     
     def __repr__(self) -> str:
         return f"<UserBadge user={self.user_id} badge={self.badge_id}>"
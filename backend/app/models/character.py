@@ -4,7 +4,7 @@ Character model for RPG elements.
 from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy import Computed, ForeignKey, Integer, String
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -48,6 +48,11 @@ class Character(Base, UUIDMixin, TimestampMixin):
     charisma: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     unallocated_points: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     
+    # Derived stats (generated by Postgres, read-only)
+    max_hp: Mapped[int] = mapped_column(
+        Integer, Computed("100 + endurance * 5", persisted=True)
+    )
+    
     # Equipped items (references to inventory)
     equipped_weapon_id: Mapped[Optional[UUID]] = mapped_column(
         PGUUID(as_uuid=True), nullable=True
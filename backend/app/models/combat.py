@@ -5,7 +5,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING, Any, Optional
 from uuid import UUID
 
-from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID as PGUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -40,9 +40,9 @@ class Combat(Base, UUIDMixin):
     # Bet
     bet_coins: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     
-    # Combat log (detailed turn-by-turn)
+    # Combat log (detailed turn-by-turn), deferred: only the details view needs it
     combat_log: Mapped[list[dict[str, Any]]] = mapped_column(
-        JSONB, default=list, nullable=False
+        JSONB, default=list, nullable=False, deferred=True
     )
     
     # Stats snapshot at time of combat
@@ -90,6 +90,24 @@ class Combat(Base, UUIDMixin):
         Index("idx_combats_challenger", "challenger_id"),
         Index("idx_combats_defender", "defender_id"),
         Index("idx_combats_created", "created_at"),
+        Index(
+            "idx_combats_challenger_status_created",
+            "challenger_id",
+            "status",
+            "created_at",
+        ),
+        Index(
+            "idx_combats_defender_status_created",
+            "defender_id",
+            "status",
+            "created_at",
+        ),
+        Index(
+            "idx_combats_pending_pair",
+            "challenger_id",
+            "defender_id",
+            postgresql_where=text("status = 'pending'"),
+        ),
     )
     
     def __repr__(self) -> str:
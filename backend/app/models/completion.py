@@ -68,9 +68,10 @@ class Completion(Base, UUIDMixin):
     user: Mapped["User"] = relationship("User", back_populates="completions")
     
     __table_args__ = (
+        # Also serves per-habit lookups (habit_id leads)
         UniqueConstraint("habit_id", "completed_date", name="uq_completion_habit_date"),
-        Index("idx_completions_habit_id", "habit_id"),
-        Index("idx_completions_user_date", "user_id", "completed_date"),
+        # Per-user date lookups; habit_id makes "which habits on this day" index-only
+        Index("idx_completions_user_date_habit", "user_id", "completed_date", "habit_id"),
         Index("idx_completions_date", "completed_date"),
     )
     
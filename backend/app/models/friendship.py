@@ -4,7 +4,7 @@ Friendship model for social features.
 from typing import TYPE_CHECKING
 from uuid import UUID
 
-from sqlalchemy import CheckConstraint, ForeignKey, Index, String, UniqueConstraint
+from sqlalchemy import CheckConstraint, ForeignKey, Index, String, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -48,12 +48,52 @@ class Friendship(Base, UUIDMixin, TimestampMixin):
         back_populates="received_friend_requests",
     )
     
+    # Fetch server-generated timestamps (created_at on insert, updated_at on
+    # accept/reject) via RETURNING during flush instead of expiring them
+    __mapper_args__ = {"eager_defaults": True}
+    
     __table_args__ = (
         UniqueConstraint("requester_id", "addressee_id", name="uq_friendship_pair"),
+        # At most one friendship per unordered pair, whichever side asked
+        Index(
+            "idx_friendships_unordered_pair",
+            text("LEAST(requester_id, addressee_id)"),
+            text("GREATEST(requester_id, addressee_id)"),
+            unique=True,
+        ),
         CheckConstraint("requester_id != addressee_id", name="ck_not_self_friend"),
         Index("idx_friendships_requester", "requester_id"),
         Index("idx_friendships_addressee", "addressee_id"),
         Index("idx_friendships_status", "status"),
+        # Friends list / pending requests, in keyset order (created_at, id)
+        Index(
+            "idx_friendships_requester_accepted",
+            "requester_id",
+            "created_at",
+            "id",
+            postgresql_where=text("status = 'accepted'"),
+        ),
+        Index(
+            "idx_friendships_addressee_accepted",
+            "addressee_id",
+            "created_at",
+            "id",
+            postgresql_where=text("status = 'accepted'"),
+        ),
+        Index(
+            "idx_friendships_addressee_pending",
+            "addressee_id",
+            "created_at",
+            "id",
+            postgresql_where=text("status = 'pending'"),
+        ),
+        Index(
+            "idx_friendships_requester_pending",
+            "requester_id",
+            "created_at",
+            "id",
+            postgresql_where=text("status = 'pending'"),
+        ),
     )
     
     def __repr__(self) -> str:
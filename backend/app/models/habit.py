@@ -85,8 +85,14 @@ class Habit(Base, UUIDMixin, TimestampMixin):
     
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="habits")
+    # Full completion history: never loaded implicitly, and removed by the
+    # ON DELETE CASCADE foreign key rather than row by row
     completions: Mapped[list["Completion"]] = relationship(
-        "Completion", back_populates="habit", lazy="selectin"
+        "Completion",
+        back_populates="habit",
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     
     __table_args__ = (
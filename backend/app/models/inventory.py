@@ -55,7 +55,9 @@ class UserInventory(Base, UUIDMixin):
     )
     
     # Relationships
-    user: Mapped["User"] = relationship("User", back_populates="inventory")
+    user: Mapped["User"] = relationship(
+        "User", back_populates="inventory", lazy="raise"
+    )
     item: Mapped["Item"] = relationship("Item", back_populates="inventories")
     
     __table_args__ = (
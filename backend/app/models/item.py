@@ -62,8 +62,9 @@ class Item(Base, UUIDMixin):
     )
     
     # Relationships
+    # Every owner's inventory row; never needed when reading items
     inventories: Mapped[list["UserInventory"]] = relationship(
-        "UserInventory", back_populates="item", lazy="selectin"
+        "UserInventory", back_populates="item", lazy="raise"
     )
     
     __table_args__ = (
@@ -6,7 +6,7 @@ from decimal import Decimal
 from typing import TYPE_CHECKING
 from uuid import UUID
 
-from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, Numeric, String, UniqueConstraint, func
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, Numeric, String, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -58,8 +58,8 @@ class DailyStats(Base, UUIDMixin):
     )
     
     __table_args__ = (
+        # Also serves the (user_id, date) range scans of stats and leaderboards
         UniqueConstraint("user_id", "date", name="uq_daily_stats_user_date"),
-        Index("idx_daily_stats_user_date", "user_id", "date"),
     )
     
     def __repr__(self) -> str:
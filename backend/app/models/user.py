@@ -6,7 +6,7 @@ from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 
 from sqlalchemy import Boolean, Date, DateTime, Index, Integer, String, func
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
 from .base import Base, TimestampMixin, UUIDMixin
 
@@ -44,6 +44,11 @@ class User(Base, UUIDMixin, TimestampMixin):
     total_xp: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     coins: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     
+    # Denormalized count of non-archived habits, maintained by the habits router
+    active_habits_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    
     # Streaks
     current_streak: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     best_streak: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
@@ -141,10 +146,20 @@ class User(Base, UUIDMixin, TimestampMixin):
     __table_args__ = (
         Index("idx_users_email", "email"),
         Index("idx_users_username", "username"),
-        Index("idx_users_friend_code", "friend_code"),
+        Index(
+            "idx_users_friend_code_active",
+            "friend_code",
+            unique=True,
+            postgresql_where=deleted_at.is_(None),
+        ),
         Index("idx_users_google_id", "google_id", postgresql_where=google_id.isnot(None)),
     )
     
+    @validates("friend_code")
+    def _normalize_friend_code(self, key: str, value: str) -> str:
+        """Store friend codes upper-cased so lookups can match them exactly."""
+        return value.upper()
+    
     def __repr__(self) -> str:
         return f"<User {self.username} (level={self.level}, xp={self.total_xp})>"
     
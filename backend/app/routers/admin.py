@@ -193,14 +193,14 @@ async def get_admin_stats(db: AsyncSession = Depends(get_db)):
         select(Item.category, func.count(Item.id))
         .group_by(Item.category)
     )
-    items_by_category = {row[0]: row[1] for row in result.fetchall()}
+    items_by_category = {category: count for category, count in result}
     
     # Count items by rarity
     result = await db.execute(
         select(Item.rarity, func.count(Item.id))
         .group_by(Item.rarity)
     )
-    items_by_rarity = {row[0]: row[1] for row in result.fetchall()}
+    items_by_rarity = {rarity: count for rarity, count in result}
     
     # Total users
     result = await db.execute(text("SELECT COUNT(*) FROM users"))
@@ -3,20 +3,35 @@ Badges Router - Achievement System
 
 Endpoints for viewing and managing badges.
 """
+from datetime import datetime
 from uuid import UUID
 
 import structlog
 from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
-from sqlalchemy import func, select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import case, exists, func, select, update
+from sqlalchemy.orm import lazyload, selectinload
 
 from app.deps import CurrentUser, DBSession
 from app.models.badge import Badge, UserBadge
 
 logger = structlog.get_logger()
 
-router = APIRouter(prefix="/badges", tags=["Badges"])
+router = APIRouter(
+    prefix="/badges",
+    tags=["Badges"],
+    default_response_class=ORJSONResponse,
+)
+
+# Rarity tiers ranked from rarest to most common
+RARITY_RANK = {
+    "legendary": 0,
+    "epic": 1,
+    "rare": 2,
+    "uncommon": 3,
+    "common": 4,
+}
 
 
 # =============================================================================
@@ -239,13 +254,20 @@ async def get_badge_collection(
     unlocked_count = len(user_badges)
     locked_count = total_badges - unlocked_count
     
-    # Get displayed badges
+    # Get displayed badges (served by the idx_user_badge_displayed partial index)
+    displayed_result = await db.execute(
+        select(UserBadge)
+        .options(selectinload(UserBadge.badge))
+        .where(
+            UserBadge.user_id == current_user.id,
+            UserBadge.is_displayed == True,
+        )
+        .order_by(UserBadge.display_position)
+    )
     displayed = [
         user_badge_to_response(ub.badge, ub)
-        for ub in user_badges
-        if ub.is_displayed
+        for ub in displayed_result.scalars().all()
     ]
-    displayed.sort(key=lambda x: x.display_position or 99)
     
     # Recent unlocks (last 5)
     recent = [
@@ -253,16 +275,17 @@ async def get_badge_collection(
         for ub in user_badges[:5]
     ]
     
-    # Find rarest badge (by rarity tier)
-    rarity_order = ["legendary", "epic", "rare", "uncommon", "common"]
-    rarest = None
-    for rarity in rarity_order:
-        for ub in user_badges:
-            if ub.badge.rarity == rarity:
-                rarest = user_badge_to_response(ub.badge, ub)
-                break
-        if rarest:
-            break
+    # Find rarest badge (by rarity tier, most recent first on ties)
+    rarest_badge = min(
+        (ub for ub in user_badges if ub.badge.rarity in RARITY_RANK),
+        key=lambda ub: RARITY_RANK[ub.badge.rarity],
+        default=None,
+    )
+    rarest = (
+        user_badge_to_response(rarest_badge.badge, rarest_badge)
+        if rarest_badge
+        else None
+    )
     
     return BadgeCollectionResponse(
         total_badges=total_badges,
@@ -298,27 +321,33 @@ async def get_badge_details(
             detail="Badge not found",
         )
     
-    # Check if user has unlocked it
-    user_badge_result = await db.execute(
-        select(UserBadge).where(
-            UserBadge.user_id == current_user.id,
-            UserBadge.badge_id == badge_id,
-        )
-    )
-    user_badge = user_badge_result.scalar_one_or_none()
-    
-    # If it's secret and not unlocked, hide it
-    if badge.is_secret and not user_badge:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Badge not found",
+    # Secret badges stay hidden unless unlocked: cheap EXISTS probe first
+    if badge.is_secret:
+        is_unlocked = await db.scalar(
+            select(
+                exists().where(
+                    UserBadge.user_id == current_user.id,
+                    UserBadge.badge_id == badge_id,
+                )
+            )
         )
+        if not is_unlocked:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Badge not found",
+            )
     
-    # Count total unlocks
-    unlock_count_result = await db.execute(
-        select(func.count()).where(UserBadge.badge_id == badge_id)
+    # Total unlocks and the user's own unlock in a single aggregate
+    is_mine = UserBadge.user_id == current_user.id
+    unlock_result = await db.execute(
+        select(
+            func.count(),
+            func.count().filter(is_mine),
+            func.max(UserBadge.unlocked_at).filter(is_mine),
+            func.bool_or(UserBadge.is_displayed).filter(is_mine),
+        ).where(UserBadge.badge_id == badge_id)
     )
-    total_unlocks = unlock_count_result.scalar() or 0
+    total_unlocks, mine, unlocked_at, is_displayed = unlock_result.one()
     
     # Calculate percentage (approximate based on total users)
     # TODO: Get actual user count
@@ -327,11 +356,11 @@ async def get_badge_details(
     
     return BadgeDetailResponse(
         badge=badge_to_response(badge),
-        is_unlocked=user_badge is not None,
-        unlocked_at=user_badge.unlocked_at.isoformat() if user_badge else None,
+        is_unlocked=mine > 0,
+        unlocked_at=unlocked_at.isoformat() if unlocked_at else None,
         total_unlocks=total_unlocks,
         unlock_percentage=round(unlock_percentage, 1),
-        is_displayed=user_badge.is_displayed if user_badge else False,
+        is_displayed=bool(is_displayed),
     )
 
 
@@ -354,36 +383,65 @@ async def set_display_badges(
             detail="Maximum 3 badges can be displayed",
         )
     
-    # Get user's badges
-    result = await db.execute(
-        select(UserBadge)
-        .options(selectinload(UserBadge.badge))
-        .where(UserBadge.user_id == current_user.id)
-    )
-    user_badges = {ub.badge_id: ub for ub in result.scalars().all()}
+    # Validate all badge_ids are unlocked with one targeted lookup; only the
+    # columns needed for the response are fetched, no UserBadge objects.
+    unlocked: dict[UUID, tuple[Badge, datetime]] = {}
+    if data.badge_ids:
+        result = await db.execute(
+            select(Badge, UserBadge.unlocked_at)
+            .join(UserBadge, UserBadge.badge_id == Badge.id)
+            .options(lazyload(Badge.user_badges))
+            .where(
+                UserBadge.user_id == current_user.id,
+                UserBadge.badge_id.in_(data.badge_ids),
+            )
+        )
+        unlocked = {badge.id: (badge, unlocked_at) for badge, unlocked_at in result.all()}
     
-    # Validate all badge_ids are unlocked
     for badge_id in data.badge_ids:
-        if badge_id not in user_badges:
+        if badge_id not in unlocked:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Badge {badge_id} not unlocked",
             )
     
     # Clear current display settings
-    for ub in user_badges.values():
-        ub.is_displayed = False
-        ub.display_position = None
+    await db.execute(
+        update(UserBadge)
+        .where(UserBadge.user_id == current_user.id)
+        .values(is_displayed=False, display_position=None)
+        .execution_options(synchronize_session=False)
+    )
     
     # Set new display badges
-    displayed = []
-    for position, badge_id in enumerate(data.badge_ids, start=1):
-        ub = user_badges[badge_id]
-        ub.is_displayed = True
-        ub.display_position = position
-        displayed.append(user_badge_to_response(ub.badge, ub))
+    positions = {
+        badge_id: position
+        for position, badge_id in enumerate(data.badge_ids, start=1)
+    }
+    if positions:
+        await db.execute(
+            update(UserBadge)
+            .where(
+                UserBadge.user_id == current_user.id,
+                UserBadge.badge_id.in_(positions),
+            )
+            .values(
+                is_displayed=True,
+                display_position=case(positions, value=UserBadge.badge_id),
+            )
+            .execution_options(synchronize_session=False)
+        )
     
-    await db.flush()
+    displayed = [
+        UserBadgeResponse(
+            badge=badge_to_response(unlocked[badge_id][0]),
+            is_unlocked=True,
+            unlocked_at=unlocked[badge_id][1].isoformat(),
+            is_displayed=True,
+            display_position=position,
+        )
+        for badge_id, position in positions.items()
+    ]
     
     logger.info(
         "Display badges updated",
@@ -84,7 +84,10 @@ async def get_calendar_data(
         )
         .group_by(Completion.completed_date)
     )
-    completion_data = {row[0]: (row[1], row[2] or 0) for row in completions_result.fetchall()}
+    completion_data = {
+        completed_date: (habits_done, xp_earned or 0)
+        for completed_date, habits_done, xp_earned in completions_result
+    }
     
     # Build daily data for each day of the month
     days: list[CalendarDayData] = []
@@ -6,8 +6,9 @@ Endpoints for creating, viewing, and customizing player characters.
 from uuid import UUID
 
 import structlog
-from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, HTTPException, Response, status
+from redis.exceptions import RedisError
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import selectinload
 
 from app.deps import CurrentUser, CurrentUserWithCharacter, DBSession
@@ -23,11 +24,17 @@ from app.schemas.character import (
     StatPointAllocation,
     StatsDistribution,
 )
+from app.utils.redis_client import get_redis
 
 logger = structlog.get_logger()
 
 router = APIRouter(prefix="/characters", tags=["Characters"])
 
+# Serialized /characters/me payloads, shared by all workers through Redis.
+# The key holds every field that can change them, so they are never stale;
+# the TTL only evicts keys of outdated states
+CHARACTER_RESPONSE_TTL = 300
+
 
 # =============================================================================
 # Response Models
@@ -54,7 +61,7 @@ def character_to_response(character: Character, user) -> CharacterResponse:
         xp_to_next_level=xp_needed_for_next,
         total_xp=user.total_xp,
         hp=100,  # TODO: Track current HP
-        max_hp=100 + (character.endurance * 5),
+        max_hp=character.max_hp,
         stats=StatsDistribution(
             strength=character.strength,
             intelligence=character.intelligence,
@@ -76,6 +83,33 @@ def character_to_response(character: Character, user) -> CharacterResponse:
     )
 
 
+def character_response_key(character: Character, user) -> str:
+    """Redis key of a cached /characters/me payload for the current state."""
+    return (
+        f"characters:me:{character.id}:{character.updated_at.isoformat()}"
+        f":{user.total_xp}:{user.level}:{user.coins}"
+    )
+
+
+async def update_character_returning(
+    db, character_id: UUID, values: dict, *criteria
+) -> Character | None:
+    """
+    Apply an UPDATE to a character and return the refreshed row in one round-trip.
+    
+    Extra ``criteria`` are added to the WHERE clause; None is returned when
+    they exclude the row.
+    """
+    result = await db.execute(
+        update(Character)
+        .where(Character.id == character_id, *criteria)
+        .values(**values)
+        .returning(Character)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
 # =============================================================================
 # Endpoints
 # =============================================================================
@@ -89,9 +123,26 @@ def character_to_response(character: Character, user) -> CharacterResponse:
 )
 async def get_my_character(
     current_user: CurrentUserWithCharacter,
-) -> CharacterResponse:
+) -> Response:
     """Get the authenticated user's character."""
-    return character_to_response(current_user.character, current_user)
+    character = current_user.character
+    cache_key = character_response_key(character, current_user)
+    redis = get_redis()
+    
+    try:
+        content = await redis.get(cache_key)
+    except RedisError as e:
+        logger.warning("Character cache unavailable", error=str(e))
+        content = None
+    
+    if content is None:
+        content = character_to_response(character, current_user).model_dump_json()
+        try:
+            await redis.set(cache_key, content, ex=CHARACTER_RESPONSE_TTL)
+        except RedisError as e:
+            logger.warning("Character response not cached", error=str(e))
+    
+    return Response(content=content, media_type="application/json")
 
 
 @router.post(
@@ -114,27 +165,28 @@ async def create_character(
             detail="You already have a character. Delete it first to create a new one.",
         )
     
-    # Create character
-    character = Character(
-        user_id=current_user.id,
-        name=data.name,
-        character_class=data.character_class.value,
-        gender="neutral",
-        skin_color="light",
-        hair_style="short",
-        hair_color="brown",
-        eye_color="blue",
-        strength=data.stats.strength,
-        endurance=data.stats.vitality,
-        agility=data.stats.agility,
-        intelligence=data.stats.intelligence,
-        charisma=data.stats.luck,
-        unallocated_points=0,
+    # Create character (INSERT ... RETURNING fills server defaults in one trip)
+    result = await db.execute(
+        insert(Character)
+        .values(
+            user_id=current_user.id,
+            name=data.name,
+            character_class=data.character_class.value,
+            gender="neutral",
+            skin_color="light",
+            hair_style="short",
+            hair_color="brown",
+            eye_color="blue",
+            strength=data.stats.strength,
+            endurance=data.stats.vitality,
+            agility=data.stats.agility,
+            intelligence=data.stats.intelligence,
+            charisma=data.stats.luck,
+            unallocated_points=0,
+        )
+        .returning(Character)
     )
-    
-    db.add(character)
-    await db.flush()
-    await db.refresh(character)
+    character = result.scalar_one()
     
     logger.info(
         "Character created",
@@ -159,18 +211,19 @@ async def update_character(
 ) -> CharacterResponse:
     """Update the current user's character."""
     character = current_user.character
+    values = {}
     
     if data.name is not None:
-        character.name = data.name
+        values["name"] = data.name
     
     # TODO: Add avatar_id and title fields to model
     # if data.avatar_id is not None:
-    #     character.avatar_id = data.avatar_id
+    #     values["avatar_id"] = data.avatar_id
     # if data.title is not None:
-    #     character.title = data.title
+    #     values["title"] = data.title
     
-    await db.flush()
-    await db.refresh(character)
+    if values:
+        character = await update_character_returning(db, character.id, values)
     
     logger.info(
         "Character updated",
@@ -209,16 +262,27 @@ async def distribute_stats(
             detail="No points to allocate.",
         )
     
-    # Apply stat points
-    character.strength += data.strength
-    character.intelligence += data.intelligence
-    character.agility += data.agility
-    character.endurance += data.vitality
-    character.charisma += data.luck
-    character.unallocated_points -= points_to_allocate
+    # Apply stat points server-side so concurrent allocations can't overspend
+    updated = await update_character_returning(
+        db,
+        character.id,
+        {
+            "strength": Character.strength + data.strength,
+            "intelligence": Character.intelligence + data.intelligence,
+            "agility": Character.agility + data.agility,
+            "endurance": Character.endurance + data.vitality,
+            "charisma": Character.charisma + data.luck,
+            "unallocated_points": Character.unallocated_points - points_to_allocate,
+        },
+        Character.unallocated_points >= points_to_allocate,
+    )
     
-    await db.flush()
-    await db.refresh(character)
+    if updated is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Not enough unallocated points.",
+        )
+    character = updated
     
     logger.info(
         "Stats distributed",
@@ -251,6 +315,12 @@ async def preview_equipment(
     """
     character = current_user.character
     
+    # Appearance layers are not part of the current-user load
+    await db.refresh(
+        character,
+        attribute_names=["gender", "skin_color", "hair_style", "hair_color", "eye_color"],
+    )
+    
     # Collect item IDs to fetch
     item_ids = [
         item_id for item_id in [weapon_id, armor_id, helmet_id, accessory_id, pet_id]
@@ -3,27 +3,34 @@ Combat Router - PvP Challenges and Battles
 
 Endpoints for challenging friends and viewing combat history.
 """
+import asyncio
 from datetime import datetime, timedelta, timezone
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import structlog
 from fastapi import APIRouter, HTTPException, Query, status
-from pydantic import BaseModel, Field
-from sqlalchemy import and_, func, or_, select
-from sqlalchemy.orm import selectinload
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field, TypeAdapter
+from sqlalchemy import and_, case, func, insert, or_, select
+from sqlalchemy.orm import joinedload, lazyload, selectinload, undefer
 
 from app.deps import CurrentUserWithCharacter, DBSession
 from app.models.character import Character
 from app.models.combat import Combat
 from app.models.friendship import Friendship
 from app.models.inventory import UserInventory
+from app.models.item import Item
 from app.models.transaction import CoinTransaction, XPTransaction
 from app.models.user import User
 from app.services.combat_service import CombatService
 
 logger = structlog.get_logger()
 
-router = APIRouter(prefix="/combat", tags=["Combat"])
+router = APIRouter(
+    prefix="/combat",
+    tags=["Combat"],
+    default_response_class=ORJSONResponse,
+)
 
 
 # =============================================================================
@@ -134,41 +141,75 @@ class CombatStatsResponse(BaseModel):
     nemesis: str | None  # Most fought opponent
 
 
+# Validates a whole stored combat log in a single pydantic-core call
+_COMBAT_LOG_ADAPTER = TypeAdapter(list[CombatLogEntry])
+
+
 # =============================================================================
 # Helper Functions
 # =============================================================================
 
 
-async def get_equipment_bonuses(db, user_id: UUID) -> dict[str, int]:
-    """Get total equipment stat bonuses for a user."""
+async def get_equipment_bonuses_bulk(
+    db, user_ids: list[UUID]
+) -> dict[UUID, dict[str, int]]:
+    """Get total equipment stat bonuses for several users in one query."""
     result = await db.execute(
-        select(UserInventory)
-        .options(selectinload(UserInventory.item))
+        select(
+            UserInventory.user_id,
+            func.coalesce(func.sum(Item.strength_bonus), 0),
+            func.coalesce(func.sum(Item.endurance_bonus), 0),
+            func.coalesce(func.sum(Item.agility_bonus), 0),
+            func.coalesce(func.sum(Item.intelligence_bonus), 0),
+            func.coalesce(func.sum(Item.charisma_bonus), 0),
+        )
+        .join(Item, UserInventory.item_id == Item.id)
         .where(
-            UserInventory.user_id == user_id,
+            UserInventory.user_id.in_(user_ids),
             UserInventory.is_equipped == True,
         )
+        .group_by(UserInventory.user_id)
     )
-    entries = result.scalars().all()
     
     bonuses = {
-        "strength": 0,
-        "endurance": 0,
-        "agility": 0,
-        "intelligence": 0,
-        "charisma": 0,
+        user_id: {
+            "strength": 0,
+            "endurance": 0,
+            "agility": 0,
+            "intelligence": 0,
+            "charisma": 0,
+        }
+        for user_id in user_ids
     }
-    
-    for entry in entries:
-        bonuses["strength"] += entry.item.strength_bonus
-        bonuses["endurance"] += entry.item.endurance_bonus
-        bonuses["agility"] += entry.item.agility_bonus
-        bonuses["intelligence"] += entry.item.intelligence_bonus
-        bonuses["charisma"] += entry.item.charisma_bonus
+    for user_id, strength, endurance, agility, intelligence, charisma in result.all():
+        bonuses[user_id] = {
+            "strength": int(strength),
+            "endurance": int(endurance),
+            "agility": int(agility),
+            "intelligence": int(intelligence),
+            "charisma": int(charisma),
+        }
     
     return bonuses
 
 
+async def get_equipment_bonuses(db, user_id: UUID) -> dict[str, int]:
+    """Get total equipment stat bonuses for a user."""
+    bonuses = await get_equipment_bonuses_bulk(db, [user_id])
+    return bonuses[user_id]
+
+
+def opponent_class_column(user_id: UUID):
+    """SQL expression for the opponent's class from ``user_id``'s side of a combat."""
+    return func.coalesce(
+        case(
+            (Combat.challenger_id == user_id, Combat.defender_stats["class"].astext),
+            else_=Combat.challenger_stats["class"].astext,
+        ),
+        "unknown",
+    )
+
+
 def combat_to_response(combat: Combat, current_user_id: UUID) -> CombatResponse:
     """Convert Combat model to response."""
     challenger_user = combat.challenger
@@ -198,9 +239,7 @@ def combat_to_response(combat: Combat, current_user_id: UUID) -> CombatResponse:
         total_turns=combat.total_turns,
         winner_xp_reward=combat.winner_xp_reward,
         winner_coins_reward=combat.winner_coins_reward,
-        combat_log=[
-            CombatLogEntry(**entry) for entry in combat.combat_log
-        ],
+        combat_log=_COMBAT_LOG_ADAPTER.validate_python(combat.combat_log),
         created_at=combat.created_at,
     )
 
@@ -231,9 +270,10 @@ async def challenge_user(
             detail="You cannot challenge yourself",
         )
     
-    # Check if they are friends
-    friendship_result = await db.execute(
-        select(Friendship).where(
+    # Opponent, friendship and pending-challenge checks in one round-trip
+    is_friend = (
+        select(Friendship.id)
+        .where(
             Friendship.status == "accepted",
             or_(
                 and_(
@@ -246,22 +286,36 @@ async def challenge_user(
                 ),
             ),
         )
+        .exists()
+        .label("is_friend")
     )
-    if not friendship_result.scalar_one_or_none():
+    has_pending = (
+        select(Combat.id)
+        .where(
+            Combat.status == "pending",
+            Combat.challenger_id == current_user.id,
+            Combat.defender_id == user_id,
+        )
+        .exists()
+        .label("has_pending")
+    )
+    opponent_result = await db.execute(
+        select(User, is_friend, has_pending)
+        .options(joinedload(User.character), lazyload("*"))
+        .where(User.id == user_id)
+    )
+    row = opponent_result.one_or_none()
+    
+    # Friendship is checked first: a user that doesn't exist is no friend
+    if row is None or not row.is_friend:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You can only challenge friends",
         )
     
-    # Get opponent
-    opponent_result = await db.execute(
-        select(User)
-        .options(selectinload(User.character))
-        .where(User.id == user_id, User.deleted_at.is_(None))
-    )
-    opponent = opponent_result.scalar_one_or_none()
+    opponent = row.User
     
-    if not opponent:
+    if opponent.deleted_at is not None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
@@ -280,23 +334,16 @@ async def challenge_user(
             detail=f"Not enough coins. You have {current_user.coins}",
         )
     
-    # Check for existing pending challenge
-    pending_result = await db.execute(
-        select(Combat).where(
-            Combat.status == "pending",
-            Combat.challenger_id == current_user.id,
-            Combat.defender_id == user_id,
-        )
-    )
-    if pending_result.scalar_one_or_none():
+    if row.has_pending:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You already have a pending challenge with this user",
         )
     
     # Get equipment bonuses
-    challenger_bonuses = await get_equipment_bonuses(db, current_user.id)
-    defender_bonuses = await get_equipment_bonuses(db, opponent.id)
+    bonuses = await get_equipment_bonuses_bulk(db, [current_user.id, opponent.id])
+    challenger_bonuses = bonuses[current_user.id]
+    defender_bonuses = bonuses[opponent.id]
     
     # Create combatants
     challenger_state = CombatService.create_combatant(
@@ -306,13 +353,18 @@ async def challenge_user(
         opponent.character, defender_bonuses
     )
     
-    # Simulate combat
-    result = CombatService.simulate_combat(
-        challenger_state, defender_state, data.bet_coins
+    # Simulate combat (pure CPU on local state, kept off the event loop)
+    result = await asyncio.to_thread(
+        CombatService.simulate_combat,
+        challenger_state,
+        defender_state,
+        data.bet_coins,
     )
     
-    # Create combat record
+    # Create combat record (id assigned up front so the ledger rows can
+    # reference it without an intermediate flush)
     combat = Combat(
+        id=uuid4(),
         challenger_id=current_user.id,
         defender_id=opponent.id,
         winner_id=result.winner_id,
@@ -330,6 +382,7 @@ async def challenge_user(
     db.add(combat)
     
     # Apply rewards
+    coin_transactions = []
     if result.winner_id:
         winner = current_user if result.winner_id == current_user.id else opponent
         loser = opponent if result.winner_id == current_user.id else current_user
@@ -340,22 +393,24 @@ async def challenge_user(
             winner.coins += result.winner_coins
             
             # Log transactions
-            db.add(CoinTransaction(
-                user_id=winner.id,
-                amount=result.winner_coins,
-                transaction_type="combat",
-                reference_id=combat.id,
-                description=f"Won combat against {loser.username}",
-                balance_after=winner.coins,
-            ))
-            db.add(CoinTransaction(
-                user_id=loser.id,
-                amount=-data.bet_coins,
-                transaction_type="combat",
-                reference_id=combat.id,
-                description=f"Lost combat against {winner.username}",
-                balance_after=loser.coins,
-            ))
+            coin_transactions = [
+                {
+                    "user_id": winner.id,
+                    "amount": result.winner_coins,
+                    "transaction_type": "combat",
+                    "reference_id": combat.id,
+                    "description": f"Won combat against {loser.username}",
+                    "balance_after": winner.coins,
+                },
+                {
+                    "user_id": loser.id,
+                    "amount": -data.bet_coins,
+                    "transaction_type": "combat",
+                    "reference_id": combat.id,
+                    "description": f"Lost combat against {winner.username}",
+                    "balance_after": loser.coins,
+                },
+            ]
         
         # Award XP
         winner.total_xp += result.winner_xp
@@ -367,7 +422,11 @@ async def challenge_user(
             description=f"Won combat against {loser.username}",
         ))
     
+    # One flush for the combat, XP row and user updates, then both coin
+    # ledger rows in a single batched INSERT
     await db.flush()
+    if coin_transactions:
+        await db.execute(insert(CoinTransaction), coin_transactions)
     
     logger.info(
         "Combat completed",
@@ -398,32 +457,34 @@ async def get_pending_challenges(
     # Note: In current implementation, combats are instant
     # This endpoint would be used if we add async accept/decline
     result = await db.execute(
-        select(Combat)
-        .options(selectinload(Combat.challenger))
+        select(
+            Combat.id,
+            User.username.label("challenger_name"),
+            func.coalesce(
+                Combat.challenger_stats["class"].astext, "unknown"
+            ).label("challenger_class"),
+            func.coalesce(
+                Combat.challenger_stats["level"].as_integer(), 1
+            ).label("challenger_level"),
+            Combat.bet_coins,
+            Combat.created_at,
+        )
+        .join(User, User.id == Combat.challenger_id)
         .where(
             Combat.defender_id == current_user.id,
             Combat.status == "pending",
         )
         .order_by(Combat.created_at.desc())
     )
-    combats = result.scalars().all()
-    
-    pending = []
-    for combat in combats:
-        pending.append(
-            PendingChallengeResponse(
-                id=combat.id,
-                challenger_name=combat.challenger.username,
-                challenger_class=combat.challenger_stats.get("class", "unknown"),
-                challenger_level=combat.challenger_stats.get("level", 1),
-                bet_coins=combat.bet_coins,
-                message=None,  # TODO: Add message field to Combat
-                expires_at=combat.created_at + timedelta(hours=24),
-                created_at=combat.created_at,
-            )
-        )
     
-    return pending
+    return [
+        PendingChallengeResponse.model_construct(
+            **row._mapping,
+            message=None,  # TODO: Add message field to Combat
+            expires_at=row.created_at + timedelta(hours=24),
+        )
+        for row in result.all()
+    ]
 
 
 @router.get(
@@ -439,11 +500,40 @@ async def get_combat_history(
     per_page: int = Query(20, ge=1, le=50),
 ) -> list[CombatSummaryResponse]:
     """Get user's combat history."""
+    # Resolve the per-row perspective in SQL so rows map straight to the schema
+    is_challenger = Combat.challenger_id == current_user.id
+    won = Combat.winner_id == current_user.id  # NULL when there is no winner
+    lost = Combat.winner_id != current_user.id
+    opponent_name = case(
+        (
+            is_challenger,
+            select(User.username)
+            .where(User.id == Combat.defender_id)
+            .scalar_subquery(),
+        ),
+        else_=select(User.username)
+        .where(User.id == Combat.challenger_id)
+        .scalar_subquery(),
+    )
+    opponent_class = opponent_class_column(current_user.id)
+    
     result = await db.execute(
-        select(Combat)
-        .options(
-            selectinload(Combat.challenger),
-            selectinload(Combat.defender),
+        select(
+            Combat.id,
+            Combat.status,
+            opponent_name.label("opponent_name"),
+            opponent_class.label("opponent_class"),
+            is_challenger.label("is_challenger"),
+            won.label("won"),
+            Combat.bet_coins,
+            case((won, Combat.winner_xp_reward), else_=0).label("xp_earned"),
+            case(
+                (won, Combat.winner_coins_reward),
+                (lost, -Combat.bet_coins),
+                else_=0,
+            ).label("coins_earned"),
+            Combat.total_turns,
+            Combat.created_at,
         )
         .where(
             Combat.status == "completed",
@@ -456,38 +546,8 @@ async def get_combat_history(
         .offset((page - 1) * per_page)
         .limit(per_page)
     )
-    combats = result.scalars().all()
     
-    history = []
-    for combat in combats:
-        is_challenger = combat.challenger_id == current_user.id
-        opponent = combat.defender if is_challenger else combat.challenger
-        opponent_stats = combat.defender_stats if is_challenger else combat.challenger_stats
-        
-        won = None
-        if combat.winner_id:
-            won = combat.winner_id == current_user.id
-        
-        xp_earned = combat.winner_xp_reward if won else 0
-        coins_earned = combat.winner_coins_reward if won else -combat.bet_coins if won is False else 0
-        
-        history.append(
-            CombatSummaryResponse(
-                id=combat.id,
-                status=combat.status,
-                opponent_name=opponent.username,
-                opponent_class=opponent_stats.get("class", "unknown"),
-                is_challenger=is_challenger,
-                won=won,
-                bet_coins=combat.bet_coins,
-                xp_earned=xp_earned,
-                coins_earned=coins_earned,
-                total_turns=combat.total_turns,
-                created_at=combat.created_at,
-            )
-        )
-    
-    return history
+    return [CombatSummaryResponse(**row._mapping) for row in result.all()]
 
 
 @router.get(
@@ -501,68 +561,102 @@ async def get_combat_stats(
     db: DBSession,
 ) -> CombatStatsResponse:
     """Get user's PvP statistics."""
-    # Get all user's completed combats
-    result = await db.execute(
-        select(Combat)
-        .options(
-            selectinload(Combat.challenger),
-            selectinload(Combat.defender),
+    user_id = current_user.id
+    participated = and_(
+        Combat.status == "completed",
+        or_(
+            Combat.challenger_id == user_id,
+            Combat.defender_id == user_id,
+        ),
+    )
+    is_win = Combat.winner_id == user_id
+    is_loss = and_(Combat.winner_id.isnot(None), Combat.winner_id != user_id)
+    
+    # Totals in one aggregate row
+    totals_result = await db.execute(
+        select(
+            func.count(),
+            func.count().filter(is_win),
+            func.count().filter(is_loss),
+            func.count().filter(Combat.winner_id.is_(None)),
+            func.coalesce(func.sum(Combat.winner_xp_reward).filter(is_win), 0),
+            func.coalesce(func.sum(Combat.winner_coins_reward).filter(is_win), 0),
+            func.coalesce(func.sum(Combat.bet_coins).filter(is_loss), 0),
+        ).where(participated)
+    )
+    (
+        total,
+        wins,
+        losses,
+        draws,
+        total_xp,
+        total_coins_earned,
+        total_coins_lost,
+    ) = totals_result.one()
+    
+    # Most fought opponent class and opponent (ties go to the most recent)
+    is_challenger = Combat.challenger_id == user_id
+    opponent_class = opponent_class_column(user_id)
+    opponent_id = case(
+        (is_challenger, Combat.defender_id),
+        else_=Combat.challenger_id,
+    )
+    
+    favorite_class = await db.scalar(
+        select(opponent_class)
+        .where(participated)
+        .group_by(opponent_class)
+        .order_by(func.count().desc(), func.max(Combat.created_at).desc())
+        .limit(1)
+    )
+    nemesis = await db.scalar(
+        select(User.username)
+        .join(Combat, User.id == opponent_id)
+        .where(participated)
+        .group_by(User.username)
+        .order_by(func.count().desc(), func.max(Combat.created_at).desc())
+        .limit(1)
+    )
+    
+    # Win streaks as gaps-and-islands: consecutive wins share the same
+    # difference between the overall and the per-outcome row numbers
+    won = func.coalesce(is_win, False)
+    recency = func.row_number().over(order_by=Combat.created_at.desc())
+    outcomes = (
+        select(
+            won.label("won"),
+            recency.label("position"),
+            (
+                recency
+                - func.row_number().over(
+                    partition_by=won, order_by=Combat.created_at.desc()
+                )
+            ).label("run"),
         )
-        .where(
-            Combat.status == "completed",
-            or_(
-                Combat.challenger_id == current_user.id,
-                Combat.defender_id == current_user.id,
+        .where(participated)
+        .subquery()
+    )
+    win_runs = (
+        select(
+            func.count().label("length"),
+            func.min(outcomes.c.position).label("starts_at"),
+        )
+        .where(outcomes.c.won)
+        .group_by(outcomes.c.run)
+        .subquery()
+    )
+    streak_result = await db.execute(
+        select(
+            func.coalesce(
+                func.max(win_runs.c.length).filter(win_runs.c.starts_at == 1), 0
             ),
+            func.coalesce(func.max(win_runs.c.length), 0),
         )
-        .order_by(Combat.created_at.desc())
     )
-    combats = result.scalars().all()
-    
-    total = len(combats)
-    wins = 0
-    losses = 0
-    draws = 0
-    total_xp = 0
-    total_coins_earned = 0
-    total_coins_lost = 0
-    opponent_classes: dict[str, int] = {}
-    opponent_counts: dict[str, int] = {}
-    
-    current_streak = 0
-    best_streak = 0
-    streak_counting = True
-    
-    for combat in combats:
-        is_challenger = combat.challenger_id == current_user.id
-        opponent = combat.defender if is_challenger else combat.challenger
-        opponent_stats = combat.defender_stats if is_challenger else combat.challenger_stats
-        
-        # Count opponent classes
-        opp_class = opponent_stats.get("class", "unknown")
-        opponent_classes[opp_class] = opponent_classes.get(opp_class, 0) + 1
-        opponent_counts[opponent.username] = opponent_counts.get(opponent.username, 0) + 1
-        
-        if combat.winner_id == current_user.id:
-            wins += 1
-            total_xp += combat.winner_xp_reward
-            total_coins_earned += combat.winner_coins_reward
-            if streak_counting:
-                current_streak += 1
-                best_streak = max(best_streak, current_streak)
-        elif combat.winner_id is None:
-            draws += 1
-            streak_counting = False
-        else:
-            losses += 1
-            total_coins_lost += combat.bet_coins
-            streak_counting = False
+    current_streak, best_streak = streak_result.one()
     
     win_rate = (wins / total * 100) if total > 0 else 0.0
     
-    favorite_class = max(opponent_classes, key=opponent_classes.get) if opponent_classes else None
-    nemesis = max(opponent_counts, key=opponent_counts.get) if opponent_counts else None
-    
     return CombatStatsResponse(
         total_battles=total,
         wins=wins,
@@ -594,6 +688,7 @@ async def get_combat_details(
     result = await db.execute(
         select(Combat)
         .options(
+            undefer(Combat.combat_log),
             selectinload(Combat.challenger),
             selectinload(Combat.defender),
         )
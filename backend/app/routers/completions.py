@@ -8,14 +8,16 @@ Endpoints for tracking habit completions:
 - View completion history
 """
 
-from datetime import date, datetime, timedelta, timezone
+from datetime import date, datetime, time, timedelta, timezone
 from decimal import Decimal
 from typing import Optional
 from uuid import UUID
 
 import structlog
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import and_, func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+from sqlalchemy import Date, and_, exists, func, literal, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -30,13 +32,45 @@ from app.schemas.completion import (
     CompletionBackfill,
     CompletionType,
 )
-from app.services.streak_service import update_streak, get_streak_multiplier
-from app.services.xp_service import calculate_habit_xp, add_xp
+from app.services.completion_cache import (
+    TODAY_COMPLETIONS_TTL,
+    forget_today_completions,
+    today_completions_key,
+)
+from app.services.streak_service import (
+    get_streak_multiplier_decimal,
+    update_streak,
+)
+from app.services.xp_service import calculate_habit_xp, add_xp_async
 from app.utils.dependencies import CurrentUser
+from app.utils.redis_client import get_redis
 
 logger = structlog.get_logger()
 router = APIRouter(prefix="/completions", tags=["Completions"])
 
+# Serializes /completions/today payloads for the shared Redis cache
+_today_completions_adapter = TypeAdapter(list[CompletionResponse])
+
+_MIDNIGHT = time.min
+
+
+def completion_to_response(completion: Completion) -> CompletionResponse:
+    """Build a habit CompletionResponse from a trusted ORM row without validation."""
+    return CompletionResponse.model_construct(
+        id=completion.id,
+        user_id=completion.user_id,
+        completion_type=CompletionType.HABIT,
+        habit_id=completion.habit_id,
+        task_id=None,
+        xp_earned=completion.xp_earned,
+        coins_earned=completion.coins_earned,
+        streak_at_completion=0,  # Would need to track this
+        notes=completion.note,
+        mood_rating=None,
+        difficulty_rating=None,
+        completed_at=completion.created_at,
+    )
+
 
 @router.post(
     "/",
@@ -58,42 +92,41 @@ async def create_completion(
             detail="habit_id is required",
         )
     
-    # Fetch the habit and verify ownership
+    # Fetch the habit, verify ownership and check today's completion at once
+    today = date.today()
     result = await db.execute(
-        select(Habit).where(
+        select(
+            Habit,
+            exists()
+            .where(
+                Completion.habit_id == Habit.id,
+                Completion.completed_date == today,
+            )
+            .label("already_done"),
+        ).where(
             and_(
                 Habit.id == completion_data.habit_id,
                 Habit.user_id == current_user.id,
             )
         )
     )
-    habit = result.scalar_one_or_none()
+    row = result.one_or_none()
     
-    if not habit:
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Habit not found",
         )
     
+    habit, already_done = row
+    
     if habit.is_archived:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot complete an archived habit",
         )
     
-    # Check if already completed today
-    today = date.today()
-    existing_result = await db.execute(
-        select(Completion).where(
-            and_(
-                Completion.habit_id == habit.id,
-                Completion.completed_date == today,
-            )
-        )
-    )
-    existing = existing_result.scalar_one_or_none()
-    
-    if existing:
+    if already_done:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Habit already completed today",
@@ -104,7 +137,7 @@ async def create_completion(
     coins_earned = int(xp_earned * 0.5)  # Coins = 50% of XP
     
     # Get streak multiplier for display
-    streak_multiplier = get_streak_multiplier(current_user.current_streak)
+    streak_multiplier = get_streak_multiplier_decimal(current_user.current_streak)
     
     # Create completion record
     completion = Completion(
@@ -115,19 +148,14 @@ async def create_completion(
         note=completion_data.notes,
         xp_earned=xp_earned,
         coins_earned=coins_earned,
-        streak_multiplier=Decimal(str(streak_multiplier)),
+        streak_multiplier=streak_multiplier,
     )
     
     db.add(completion)
     
-    # Update habit completion count
-    habit.total_completions += 1
-    habit.total_xp_earned += xp_earned
-    
     # Add XP to user (this handles level up checks)
-    # Note: Using sync session for service compatibility
-    add_xp(
-        db=db,  # type: ignore - async session compatibility
+    leveled_up = await add_xp_async(
+        db=db,
         user=current_user,
         amount=xp_earned,
         source_type="habit",
@@ -142,13 +170,23 @@ async def create_completion(
     streak_result = await update_streak(db, current_user, today)
     new_streak = streak_result["new_streak"]
     
-    # Update habit streak
-    habit.current_streak = new_streak
-    if new_streak > habit.best_streak:
-        habit.best_streak = new_streak
+    # Update habit counters and streak in one in-place UPDATE (flushed
+    # together with the completion INSERT)
+    await db.execute(
+        update(Habit)
+        .where(Habit.id == habit.id)
+        .values(
+            total_completions=Habit.total_completions + 1,
+            total_xp_earned=Habit.total_xp_earned + xp_earned,
+            current_streak=new_streak,
+            best_streak=func.greatest(Habit.best_streak, new_streak),
+        )
+        .execution_options(synchronize_session=False)
+    )
     
     await db.commit()
     await db.refresh(completion)
+    await forget_today_completions(current_user.id, today)
     
     logger.info(
         "Habit completed",
@@ -174,8 +212,8 @@ async def create_completion(
         streak_bonus_coins=max(0, streak_bonus_coins),
         new_streak=new_streak,
         is_personal_best=streak_result.get("new_streak", 0) > streak_result.get("old_streak", 0) and new_streak > current_user.best_streak,
-        level_up=False,  # Would need to track from add_xp
-        new_level=None,
+        level_up=leveled_up,
+        new_level=current_user.level if leveled_up else None,
         badges_earned=[b.code for b in streak_result.get("badges_earned", [])],
         achievement_message=f"🔥 {new_streak}-day streak!" if new_streak >= 7 else None,
     )
@@ -246,6 +284,7 @@ async def delete_completion(
     
     await db.delete(completion)
     await db.commit()
+    await forget_today_completions(current_user.id, completion.completed_date)
     
     logger.info(
         "Completion deleted",
@@ -270,8 +309,6 @@ async def backfill_completion(
     db: AsyncSession = Depends(get_db),
 ) -> CompletionResponse:
     """Backfill a habit completion for a past date."""
-    from datetime import timedelta
-    
     today_date = date.today()
     if data.completed_date > today_date:
         raise HTTPException(
@@ -296,12 +333,15 @@ async def backfill_completion(
     if not habit:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Habit not found")
     
-    existing = await db.execute(
-        select(Completion).where(
-            and_(Completion.habit_id == habit.id, Completion.completed_date == data.completed_date)
+    already_done = await db.scalar(
+        select(
+            exists().where(
+                Completion.habit_id == habit.id,
+                Completion.completed_date == data.completed_date,
+            )
         )
     )
-    if existing.scalar_one_or_none():
+    if already_done:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Habit already completed on {data.completed_date}",
@@ -329,6 +369,7 @@ async def backfill_completion(
     
     await db.commit()
     await db.refresh(completion)
+    await forget_today_completions(current_user.id, data.completed_date)
     
     logger.info("Backfill created", habit_id=str(habit.id), date=str(data.completed_date))
     
@@ -344,7 +385,7 @@ async def backfill_completion(
         notes=completion.note,
         mood_rating=None,
         difficulty_rating=None,
-        completed_at=datetime.combine(completion.completed_date, datetime.min.time()),
+        completed_at=datetime.combine(completion.completed_date, _MIDNIGHT),
     )
 
 @router.get(
@@ -359,6 +400,17 @@ async def get_today_completions(
 ) -> list[CompletionResponse]:
     """Get all completions for today."""
     today = date.today()
+    cache_key = today_completions_key(current_user.id, today)
+    redis = get_redis()
+    
+    try:
+        cached = await redis.get(cache_key)
+    except RedisError as e:
+        logger.warning("Today completions cache unavailable", error=str(e))
+        cached = None
+    if cached is not None:
+        # Already serialized: sent as is
+        return Response(content=cached, media_type="application/json")
     
     result = await db.execute(
         select(Completion)
@@ -372,23 +424,18 @@ async def get_today_completions(
     )
     completions = result.scalars().all()
     
-    return [
-        CompletionResponse(
-            id=c.id,
-            user_id=c.user_id,
-            completion_type="habit",
-            habit_id=c.habit_id,
-            task_id=None,
-            xp_earned=c.xp_earned,
-            coins_earned=c.coins_earned,
-            streak_at_completion=0,  # Would need to track this
-            notes=c.note,
-            mood_rating=None,
-            difficulty_rating=None,
-            completed_at=c.created_at,
+    response = [completion_to_response(c) for c in completions]
+    
+    try:
+        await redis.set(
+            cache_key,
+            _today_completions_adapter.dump_json(response),
+            ex=TODAY_COMPLETIONS_TTL,
         )
-        for c in completions
-    ]
+    except RedisError as e:
+        logger.warning("Today completions cache unavailable", error=str(e))
+    
+    return response
 
 
 @router.get(
@@ -422,23 +469,7 @@ async def get_completion_history(
     result = await db.execute(query)
     completions = result.scalars().all()
     
-    return [
-        CompletionResponse(
-            id=c.id,
-            user_id=c.user_id,
-            completion_type="habit",
-            habit_id=c.habit_id,
-            task_id=None,
-            xp_earned=c.xp_earned,
-            coins_earned=c.coins_earned,
-            streak_at_completion=0,
-            notes=c.note,
-            mood_rating=None,
-            difficulty_rating=None,
-            completed_at=c.created_at,
-        )
-        for c in completions
-    ]
+    return [completion_to_response(c) for c in completions]
 
 
 @router.get(
@@ -456,8 +487,15 @@ async def get_daily_summaries(
     today = date.today()
     start_date = today - timedelta(days=days - 1)
     
-    # Get completions grouped by date
-    result = await db.execute(
+    # Completions grouped by date, joined onto a dense series of days so
+    # days without completions come back as zero rows.
+    day_offsets = (
+        func.generate_series(0, days - 1)
+        .table_valued("day_offset")
+        .render_derived(name="day_offsets")
+    )
+    day = (literal(today, Date) - day_offsets.c.day_offset).label("day")
+    daily_stats = (
         select(
             Completion.completed_date,
             func.count(Completion.id).label("count"),
@@ -472,42 +510,31 @@ async def get_daily_summaries(
             )
         )
         .group_by(Completion.completed_date)
-        .order_by(Completion.completed_date.desc())
+        .subquery()
     )
-    completion_stats = {row[0]: row for row in result.fetchall()}
-    
-    # Get total habits for each day (simplified - counts all non-archived habits)
-    habit_count_result = await db.execute(
-        select(func.count(Habit.id))
-        .where(
-            and_(
-                Habit.user_id == current_user.id,
-                Habit.is_archived == False,
-            )
+    result = await db.execute(
+        select(
+            day,
+            func.coalesce(daily_stats.c.count, 0),
+            func.coalesce(daily_stats.c.total_xp, 0),
+            func.coalesce(daily_stats.c.total_coins, 0),
         )
+        .select_from(day_offsets)
+        .outerjoin(daily_stats, daily_stats.c.completed_date == day)
+        .order_by(day_offsets.c.day_offset)
     )
-    total_habits = habit_count_result.scalar() or 0
     
-    # Build summaries for each day
-    summaries = []
-    current_date = today
+    # Total habits for each day (simplified - all non-archived habits),
+    # kept denormalized on the user by the habits router
+    total_habits = current_user.active_habits_count
     
-    while current_date >= start_date:
-        stats = completion_stats.get(current_date)
-        
-        if stats:
-            habits_completed = stats[1]
-            total_xp = stats[2] or 0
-            total_coins = stats[3] or 0
-            completion_rate = (habits_completed / total_habits * 100) if total_habits > 0 else 0
-        else:
-            habits_completed = 0
-            total_xp = 0
-            total_coins = 0
-            completion_rate = 0
+    # Build summaries for each day (most recent first)
+    summaries = []
+    for current_date, habits_completed, total_xp, total_coins in result.all():
+        completion_rate = (habits_completed / total_habits * 100) if total_habits > 0 else 0
         
         summaries.append(DailyCompletionSummary(
-            date=datetime.combine(current_date, datetime.min.time()),
+            date=datetime.combine(current_date, _MIDNIGHT),
             habits_completed=habits_completed,
             habits_total=total_habits,
             tasks_completed=0,  # Would need separate tracking
@@ -515,7 +542,5 @@ async def get_daily_summaries(
             total_coins=total_coins,
             completion_rate=round(completion_rate, 1),
         ))
-        
-        current_date -= timedelta(days=1)
     
     return summaries
@@ -8,15 +8,37 @@ Endpoints for managing friendships:
 """
 
 from datetime import datetime, timezone
+from itertools import chain
 from typing import Annotated
 from uuid import UUID
 
+import orjson
 import structlog
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import and_, or_, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import (
+    Row,
+    String,
+    Text,
+    and_,
+    case,
+    cast,
+    delete,
+    false,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload, selectinload
 
 from app.database import get_db
+from app.models.character import Character
 from app.models.friendship import Friendship
 from app.models.user import User
 from app.schemas.friend import (
@@ -26,50 +48,219 @@ from app.schemas.friend import (
     FriendshipStatus,
     PendingRequestsResponse,
 )
-from app.deps import CurrentUser
+from app.deps import CurrentUser, CurrentUserId
+from app.services.friend_service import (
+    accepted_friendship_filter,
+    forget_friend_ids,
+)
+from app.utils.cache import LRUCache
+from app.utils.pagination import decode_cursor, encode_cursor
 
 logger = structlog.get_logger()
 
 router = APIRouter(prefix="/friends", tags=["friends"])
 
+# Friend responses only read the character; every other relationship on User
+# would otherwise be selectin-loaded, so fail loudly instead
+FRIEND_USER_LOAD_OPTIONS = (selectinload(User.character), raiseload("*"))
+
+# Friend code -> user id; codes are immutable and deleted users are still
+# filtered out by the lookup query, so entries never need invalidating
+_friend_code_cache = LRUCache(maxsize=10_000, ttl=3600)
+
+# Stored status string -> enum member, without going through Enum.__call__
+_FRIENDSHIP_STATUSES = {member.value: member for member in FriendshipStatus}
+
 
 # ============================================================================
 # Helper Functions
 # ============================================================================
 
 
-async def get_friend_ids(db: AsyncSession, user_id: UUID) -> list[UUID]:
-    """Get list of friend user IDs for a user."""
+def friendship_between(user_id, other_id):
+    """WHERE/ON clause for a friendship between two users, either direction.
+    
+    Arguments may be ids or columns (e.g. ``User.id`` in a join).
+    """
+    return or_(
+        and_(
+            Friendship.requester_id == user_id,
+            Friendship.addressee_id == other_id,
+        ),
+        and_(
+            Friendship.requester_id == other_id,
+            Friendship.addressee_id == user_id,
+        ),
+    )
+
+
+async def find_request_target(
+    db: AsyncSession,
+    user_id: UUID,
+    *criteria,
+) -> Row | None:
+    """Look up a friend-request target and any friendship with ``user_id``.
+    
+    One round-trip: the target user is LEFT JOINed to an existing friendship
+    in either direction, returned as ``(User, Friendship)`` with the
+    friendship None when there is no relationship yet.
+    """
     result = await db.execute(
-        select(Friendship).where(
-            and_(
-                or_(
-                    Friendship.requester_id == user_id,
-                    Friendship.addressee_id == user_id,
-                ),
-                Friendship.status == "accepted",
-            )
+        select(User, Friendship)
+        .outerjoin(Friendship, friendship_between(user_id, User.id))
+        .where(*criteria, User.deleted_at.is_(None))
+        .options(raiseload("*"))
+        .limit(1)
+    )
+    return result.first()
+
+
+def resolve_existing_friendship(target: Row) -> Friendship | None:
+    """Check the relationship found by ``find_request_target``.
+    
+    A pending request from the target is accepted and returned; the caller
+    commits it and calls ``forget_friend_ids``. A rejected friendship falls
+    through: ``insert_friend_request`` reopens it.
+    
+    Raises:
+        HTTPException: 400 if already friends or already pending,
+            403 if blocked.
+    """
+    friendship = target.Friendship
+    if friendship is None:
+        return None
+    
+    if friendship.status == "accepted":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You are already friends with this user",
+        )
+    elif friendship.status == "pending":
+        # If they sent us a request, auto-accept
+        if friendship.requester_id == target.User.id:
+            friendship.accept()
+            return friendship
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Friend request already pending",
         )
+    elif friendship.status == "blocked":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Cannot send request to this user",
+        )
+    
+    return None
+
+
+async def insert_friend_request(
+    db: AsyncSession,
+    requester_id: UUID,
+    addressee_id: UUID,
+) -> Friendship:
+    """Atomically create a pending request between two users.
+    
+    ``INSERT ... ON CONFLICT DO UPDATE ... RETURNING`` on the unordered-pair
+    index, so a concurrent request between the same users cannot create a
+    duplicate and the new row comes back in the same round-trip. A
+    previously rejected pair is reopened as a fresh request from
+    ``requester_id``, whichever side was rejected.
+    
+    Raises:
+        HTTPException: 409 if the pair already has a pending, accepted or
+            blocked friendship.
+    """
+    stmt = pg_insert(Friendship).values(
+        requester_id=requester_id,
+        addressee_id=addressee_id,
+        status="pending",
+    )
+    friendship = await db.scalar(
+        stmt.on_conflict_do_update(
+            index_elements=[
+                func.least(Friendship.requester_id, Friendship.addressee_id),
+                func.greatest(Friendship.requester_id, Friendship.addressee_id),
+            ],
+            set_={
+                "requester_id": stmt.excluded.requester_id,
+                "addressee_id": stmt.excluded.addressee_id,
+                "status": "pending",
+                "created_at": func.now(),
+            },
+            where=Friendship.status == "rejected",
+        )
+        .returning(Friendship)
+        .execution_options(populate_existing=True)
     )
-    friendships = result.scalars().all()
     
-    friend_ids = []
-    for f in friendships:
-        friend_id = f.addressee_id if f.requester_id == user_id else f.requester_id
-        friend_ids.append(friend_id)
+    if friendship is None:
+        existing_status = await db.scalar(
+            select(Friendship.status).where(
+                func.least(Friendship.requester_id, Friendship.addressee_id)
+                == func.least(requester_id, addressee_id),
+                func.greatest(Friendship.requester_id, Friendship.addressee_id)
+                == func.greatest(requester_id, addressee_id),
+            )
+        )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"A friendship with this user already exists ({existing_status})",
+        )
     
-    return friend_ids
+    return friendship
+
+
+async def get_pending_page(
+    db: AsyncSession,
+    direction,
+    other_user_id,
+    limit: int,
+    cursor: str | None,
+) -> list[Row]:
+    """One keyset page of pending requests as ``(Friendship, User)`` rows.
+    
+    ``direction`` selects incoming or outgoing requests and
+    ``other_user_id`` is the column joined to the user on the other side.
+    """
+    query = (
+        select(Friendship, User)
+        .join(User, User.id == other_user_id)
+        .where(direction, Friendship.status == "pending")
+        .options(raiseload("*"))
+        .order_by(Friendship.created_at.desc(), Friendship.id.desc())
+        .limit(limit)
+    )
+    if cursor:
+        cursor_ts, cursor_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(Friendship.created_at, Friendship.id) < (cursor_ts, cursor_id)
+        )
+    
+    result = await db.execute(query)
+    return result.all()
+
 
+def next_page_cursor(rows: list[Row], limit: int) -> str | None:
+    """Cursor after the last ``(Friendship, ...)`` row of a full page."""
+    if len(rows) < limit:
+        return None
+    last = rows[-1].Friendship
+    return encode_cursor(last.created_at, last.id)
 
-def build_friend_response(friendship: Friendship, current_user_id: UUID, friend: User) -> FriendResponse:
-    """Build a FriendResponse from a Friendship and User."""
+
+def build_friend_response(
+    friendship: Friendship,
+    friend: User,
+    character: Character | None,
+) -> FriendResponse:
+    """Build a FriendResponse from a Friendship, the friend and their character."""
     return FriendResponse(
         friendship_id=friendship.id,
         user_id=friend.id,
         username=friend.username,
         avatar_url=friend.avatar_url,
-        character_name=friend.character.name if friend.character else None,
-        character_class=friend.character.character_class if friend.character else None,
+        character_name=character.name if character else None,
+        character_class=character.character_class if character else None,
         level=friend.level,
         total_xp=friend.total_xp,
         current_streak=friend.current_streak,
@@ -93,7 +284,7 @@ def build_request_response(
         from_level=from_user.level,
         to_user_id=to_user.id,
         message=None,  # Message not stored in current model
-        status=FriendshipStatus(friendship.status),
+        status=_FRIENDSHIP_STATUSES[friendship.status],
         created_at=friendship.created_at,
     )
 
@@ -113,66 +304,111 @@ async def list_friends(
     current_user: CurrentUser,
     db: AsyncSession = Depends(get_db),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
-) -> FriendListResponse:
-    """Get paginated list of friends."""
-    # Get accepted friendships
-    result = await db.execute(
-        select(Friendship).where(
-            and_(
-                or_(
-                    Friendship.requester_id == current_user.id,
-                    Friendship.addressee_id == current_user.id,
-                ),
-                Friendship.status == "accepted",
-            )
-        ).offset(offset).limit(limit)
+    cursor: str | None = Query(None, description="Cursor from a previous page"),
+    offset: int = Query(0, ge=0, deprecated=True),
+) -> Response:
+    """Get paginated list of friends, newest first.
+    
+    Pages are keyset-paginated with ``cursor``; ``offset`` is kept for
+    older clients and ignored when a cursor is given.
+    
+    Postgres renders the page as a JSON array (``jsonb_agg``) alongside the
+    total and the last row's position, so no per-friend response models are
+    built; the body is returned as-is.
+    """
+    # Built once and shared by the page and count queries
+    accepted = accepted_friendship_filter(current_user.id)
+    
+    # Accepted friendships joined to the friend and their character,
+    # projected to exactly the FriendResponse fields
+    friend_id = case(
+        (Friendship.requester_id == current_user.id, Friendship.addressee_id),
+        else_=Friendship.requester_id,
     )
-    friendships = result.scalars().all()
-    
-    # Build friend list
-    friends = []
-    online_count = 0
-    
-    for friendship in friendships:
-        # Determine friend ID
-        friend_id = (
-            friendship.addressee_id
-            if friendship.requester_id == current_user.id
-            else friendship.requester_id
+    page_query = (
+        select(
+            Friendship.id.label("friendship_id"),
+            User.id.label("user_id"),
+            User.username,
+            User.avatar_url,
+            Character.name.label("character_name"),
+            Character.character_class,
+            User.level,
+            User.total_xp,
+            User.current_streak,
+            User.last_login_at.label("last_active"),
+            Friendship.created_at.label("friends_since"),
         )
-        
-        # Fetch friend user
-        friend_result = await db.execute(
-            select(User).where(User.id == friend_id)
+        .join(User, User.id == friend_id)
+        .outerjoin(Character, Character.user_id == User.id)
+        .where(accepted)
+        .order_by(Friendship.created_at.desc(), Friendship.id.desc())
+        .limit(limit)
+    )
+    if cursor:
+        cursor_ts, cursor_id = decode_cursor(cursor)
+        page_query = page_query.where(
+            tuple_(Friendship.created_at, Friendship.id) < (cursor_ts, cursor_id)
         )
-        friend = friend_result.scalar_one_or_none()
-        
-        if friend:
-            friend_response = build_friend_response(friendship, current_user.id, friend)
-            friends.append(friend_response)
-            if friend_response.is_online:
-                online_count += 1
-    
-    # Get total count
-    count_result = await db.execute(
-        select(Friendship).where(
-            and_(
-                or_(
-                    Friendship.requester_id == current_user.id,
-                    Friendship.addressee_id == current_user.id,
+    elif offset:
+        page_query = page_query.offset(offset)
+    page = page_query.subquery("page")
+    
+    # Keys are typed literals: asyncpg can't infer the type of a bare
+    # string parameter passed to jsonb_build_object's variadic "any"
+    friend_object = func.jsonb_build_object(
+        *chain.from_iterable(
+            (literal(column.name, String), column) for column in page.c
+        ),
+        # Online presence would need WebSocket tracking for real-time
+        literal("is_online", String), false(),
+    )
+    result = await db.execute(
+        select(
+            cast(
+                func.coalesce(
+                    func.jsonb_agg(
+                        aggregate_order_by(
+                            friend_object,
+                            page.c.friends_since.desc(),
+                            page.c.friendship_id.desc(),
+                        )
+                    ),
+                    literal_column("'[]'::jsonb"),
                 ),
-                Friendship.status == "accepted",
-            )
-        )
+                Text,
+            ).label("friends"),
+            func.count().label("page_size"),
+            # Position of the last (oldest) row on the page
+            func.min(page.c.friends_since).label("last_friends_since"),
+            func.array_agg(
+                aggregate_order_by(
+                    page.c.friendship_id,
+                    page.c.friends_since,
+                    page.c.friendship_id,
+                )
+            )[1].label("last_friendship_id"),
+            select(func.count())
+            .select_from(Friendship)
+            .where(accepted)
+            .scalar_subquery()
+            .label("total"),
+        ).select_from(page)
     )
-    total = len(count_result.scalars().all())
+    row = result.one()
     
-    return FriendListResponse(
-        friends=friends,
-        total=total,
-        online_count=online_count,
-    )
+    next_cursor = None
+    if row.page_size == limit:
+        next_cursor = encode_cursor(row.last_friends_since, row.last_friendship_id)
+    
+    # The friends array is already JSON: embedded as is
+    content = orjson.dumps({
+        "friends": orjson.Fragment(row.friends),
+        "total": row.total,
+        "online_count": 0,
+        "next_cursor": next_cursor,
+    })
+    return Response(content=content, media_type="application/json")
 
 
 @router.post(
@@ -195,73 +431,29 @@ async def send_friend_request(
             detail="You cannot send a friend request to yourself",
         )
     
-    # Check target user exists
-    target_result = await db.execute(
-        select(User).where(User.id == user_id, User.deleted_at.is_(None))
-    )
-    target_user = target_result.scalar_one_or_none()
+    # Check target user exists, along with any existing friendship/request
+    target = await find_request_target(db, current_user.id, User.id == user_id)
     
-    if not target_user:
+    if target is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
     
-    # Check existing friendship/request
-    existing = await db.execute(
-        select(Friendship).where(
-            or_(
-                and_(
-                    Friendship.requester_id == current_user.id,
-                    Friendship.addressee_id == user_id,
-                ),
-                and_(
-                    Friendship.requester_id == user_id,
-                    Friendship.addressee_id == current_user.id,
-                ),
-            )
-        )
-    )
-    existing_friendship = existing.scalar_one_or_none()
-    
-    if existing_friendship:
-        if existing_friendship.status == "accepted":
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="You are already friends with this user",
-            )
-        elif existing_friendship.status == "pending":
-            # If they sent us a request, auto-accept
-            if existing_friendship.requester_id == user_id:
-                existing_friendship.accept()
-                await db.flush()
-                return build_request_response(
-                    existing_friendship, target_user, current_user
-                )
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Friend request already pending",
-            )
-        elif existing_friendship.status == "blocked":
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Cannot send request to this user",
-            )
+    target_user = target.User
+    auto_accepted = resolve_existing_friendship(target)
+    if auto_accepted:
+        await db.commit()
+        await forget_friend_ids(current_user.id, target_user.id)
+        return build_request_response(auto_accepted, target_user, current_user)
     
     # Create new request
-    friendship = Friendship(
-        requester_id=current_user.id,
-        addressee_id=user_id,
-        status="pending",
-    )
-    db.add(friendship)
-    await db.flush()
-    await db.refresh(friendship)
+    friendship = await insert_friend_request(db, current_user.id, user_id)
     
     logger.info(
         "Friend request sent",
-        requester_id=str(current_user.id),
-        addressee_id=str(user_id),
+        requester_id=current_user.id,
+        addressee_id=user_id,
     )
     
     return build_request_response(friendship, current_user, target_user)
@@ -297,21 +489,24 @@ async def accept_friend_request(
     
     # Accept the request
     friendship.accept()
-    await db.flush()
+    await db.commit()
+    await forget_friend_ids(friendship.requester_id, friendship.addressee_id)
     
     # Get requester info
     requester_result = await db.execute(
-        select(User).where(User.id == friendship.requester_id)
+        select(User)
+        .where(User.id == friendship.requester_id)
+        .options(*FRIEND_USER_LOAD_OPTIONS)
     )
     requester = requester_result.scalar_one()
     
     logger.info(
         "Friend request accepted",
-        friendship_id=str(request_id),
-        user_id=str(current_user.id),
+        friendship_id=request_id,
+        user_id=current_user.id,
     )
     
-    return build_friend_response(friendship, current_user.id, requester)
+    return build_friend_response(friendship, requester, requester.character)
 
 
 @router.post(
@@ -326,30 +521,28 @@ async def reject_friend_request(
     db: AsyncSession = Depends(get_db),
 ) -> None:
     """Reject a friend request."""
-    # Find the request
-    result = await db.execute(
-        select(Friendship).where(
+    # Reject the request in place; no row back means it wasn't ours/pending
+    rejected_id = await db.scalar(
+        update(Friendship)
+        .where(
             Friendship.id == request_id,
             Friendship.addressee_id == current_user.id,
             Friendship.status == "pending",
         )
+        .values(status="rejected")
+        .returning(Friendship.id)
     )
-    friendship = result.scalar_one_or_none()
     
-    if not friendship:
+    if rejected_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Friend request not found",
         )
     
-    # Reject (or delete) the request
-    friendship.reject()
-    await db.flush()
-    
     logger.info(
         "Friend request rejected",
-        friendship_id=str(request_id),
-        user_id=str(current_user.id),
+        friendship_id=request_id,
+        user_id=current_user.id,
     )
 
 
@@ -365,40 +558,29 @@ async def remove_friend(
     db: AsyncSession = Depends(get_db),
 ) -> None:
     """Remove a friend."""
-    # Find the friendship
-    result = await db.execute(
-        select(Friendship).where(
-            and_(
-                or_(
-                    and_(
-                        Friendship.requester_id == current_user.id,
-                        Friendship.addressee_id == user_id,
-                    ),
-                    and_(
-                        Friendship.requester_id == user_id,
-                        Friendship.addressee_id == current_user.id,
-                    ),
-                ),
-                Friendship.status == "accepted",
-            )
+    # Delete the friendship; no row back means there was none
+    removed_id = await db.scalar(
+        delete(Friendship)
+        .where(
+            friendship_between(current_user.id, user_id),
+            Friendship.status == "accepted",
         )
+        .returning(Friendship.id)
     )
-    friendship = result.scalar_one_or_none()
     
-    if not friendship:
+    if removed_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Friendship not found",
         )
     
-    # Delete the friendship
-    await db.delete(friendship)
-    await db.flush()
+    await db.commit()
+    await forget_friend_ids(current_user.id, user_id)
     
     logger.info(
         "Friend removed",
-        user_id=str(current_user.id),
-        removed_user_id=str(user_id),
+        user_id=current_user.id,
+        removed_user_id=user_id,
     )
 
 
@@ -411,47 +593,68 @@ async def remove_friend(
 async def get_pending_requests(
     current_user: CurrentUser,
     db: AsyncSession = Depends(get_db),
+    limit: int = Query(50, ge=1, le=100),
+    incoming_cursor: str | None = Query(
+        None, description="Cursor from a previous page of incoming requests"
+    ),
+    outgoing_cursor: str | None = Query(
+        None, description="Cursor from a previous page of outgoing requests"
+    ),
 ) -> PendingRequestsResponse:
-    """Get all pending friend requests."""
-    # Incoming requests
-    incoming_result = await db.execute(
-        select(Friendship).where(
-            Friendship.addressee_id == current_user.id,
-            Friendship.status == "pending",
-        )
+    """Get pending friend requests, newest first.
+    
+    Each direction is keyset-paginated on its own cursor and capped at
+    ``limit`` rows; the counts are totals across all pages.
+    """
+    # Incoming requests, joined to the requester
+    incoming_rows = await get_pending_page(
+        db,
+        Friendship.addressee_id == current_user.id,
+        Friendship.requester_id,
+        limit,
+        incoming_cursor,
     )
-    incoming_friendships = incoming_result.scalars().all()
-    
-    incoming = []
-    for f in incoming_friendships:
-        requester_result = await db.execute(
-            select(User).where(User.id == f.requester_id)
-        )
-        requester = requester_result.scalar_one()
-        incoming.append(build_request_response(f, requester, current_user))
-    
-    # Outgoing requests
-    outgoing_result = await db.execute(
-        select(Friendship).where(
-            Friendship.requester_id == current_user.id,
-            Friendship.status == "pending",
-        )
+    incoming = [
+        build_request_response(f, requester, current_user)
+        for f, requester in incoming_rows
+    ]
+    
+    # Outgoing requests, joined to the addressee
+    outgoing_rows = await get_pending_page(
+        db,
+        Friendship.requester_id == current_user.id,
+        Friendship.addressee_id,
+        limit,
+        outgoing_cursor,
     )
-    outgoing_friendships = outgoing_result.scalars().all()
-    
-    outgoing = []
-    for f in outgoing_friendships:
-        addressee_result = await db.execute(
-            select(User).where(User.id == f.addressee_id)
+    outgoing = [
+        build_request_response(f, current_user, addressee)
+        for f, addressee in outgoing_rows
+    ]
+    
+    # Totals for both directions in one pass over the pending indexes
+    counts = (
+        await db.execute(
+            select(
+                func.count().filter(Friendship.addressee_id == current_user.id),
+                func.count().filter(Friendship.requester_id == current_user.id),
+            ).where(
+                or_(
+                    Friendship.addressee_id == current_user.id,
+                    Friendship.requester_id == current_user.id,
+                ),
+                Friendship.status == "pending",
+            )
         )
-        addressee = addressee_result.scalar_one()
-        outgoing.append(build_request_response(f, current_user, addressee))
+    ).one()
     
     return PendingRequestsResponse(
         incoming=incoming,
         outgoing=outgoing,
-        incoming_count=len(incoming),
-        outgoing_count=len(outgoing),
+        incoming_count=counts[0],
+        outgoing_count=counts[1],
+        incoming_next_cursor=next_page_cursor(incoming_rows, limit),
+        outgoing_next_cursor=next_page_cursor(outgoing_rows, limit),
     )
 
 
@@ -461,12 +664,31 @@ async def get_pending_requests(
     description="Get your unique friend code for sharing",
 )
 async def get_friend_code(
-    current_user: CurrentUser,
+    current_user_id: CurrentUserId,
+    db: AsyncSession = Depends(get_db),
 ) -> dict:
-    """Get the current user's friend code."""
+    """Get the current user's friend code.
+    
+    Only the two returned columns are read, by primary key, instead of
+    loading the full user through ``CurrentUser``.
+    """
+    result = await db.execute(
+        select(User.friend_code, User.username).where(
+            User.id == current_user_id,
+            User.deleted_at.is_(None),
+        )
+    )
+    row = result.first()
+    
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+    
     return {
-        "friend_code": current_user.friend_code,
-        "username": current_user.username,
+        "friend_code": row.friend_code,
+        "username": row.username,
     }
 
 
@@ -483,21 +705,25 @@ async def add_by_friend_code(
     db: AsyncSession = Depends(get_db),
 ) -> FriendRequestResponse:
     """Send a friend request using a friend code."""
-    # Find user by friend code
-    result = await db.execute(
-        select(User).where(
-            User.friend_code == code.upper(),
-            User.deleted_at.is_(None),
-        )
+    # Find user by friend code, along with any existing friendship/request.
+    # Codes never change, so a cached id turns this into a primary key lookup.
+    code = code.upper()
+    cached_user_id = _friend_code_cache.get(code)
+    target = await find_request_target(
+        db,
+        current_user.id,
+        User.id == cached_user_id if cached_user_id else User.friend_code == code,
     )
-    target_user = result.scalar_one_or_none()
     
-    if not target_user:
+    if target is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Invalid friend code",
         )
     
+    target_user = target.User
+    _friend_code_cache.set(code, target_user.id)
+    
     # Can't friend yourself
     if target_user.id == current_user.id:
         raise HTTPException(
@@ -505,61 +731,19 @@ async def add_by_friend_code(
             detail="You cannot add yourself as a friend",
         )
     
-    # Check existing friendship/request
-    existing = await db.execute(
-        select(Friendship).where(
-            or_(
-                and_(
-                    Friendship.requester_id == current_user.id,
-                    Friendship.addressee_id == target_user.id,
-                ),
-                and_(
-                    Friendship.requester_id == target_user.id,
-                    Friendship.addressee_id == current_user.id,
-                ),
-            )
-        )
-    )
-    existing_friendship = existing.scalar_one_or_none()
-    
-    if existing_friendship:
-        if existing_friendship.status == "accepted":
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="You are already friends with this user",
-            )
-        elif existing_friendship.status == "pending":
-            # If they sent us a request, auto-accept
-            if existing_friendship.requester_id == target_user.id:
-                existing_friendship.accept()
-                await db.flush()
-                return build_request_response(
-                    existing_friendship, target_user, current_user
-                )
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Friend request already pending",
-            )
-        elif existing_friendship.status == "blocked":
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Cannot send request to this user",
-            )
+    auto_accepted = resolve_existing_friendship(target)
+    if auto_accepted:
+        await db.commit()
+        await forget_friend_ids(current_user.id, target_user.id)
+        return build_request_response(auto_accepted, target_user, current_user)
     
     # Create new request
-    friendship = Friendship(
-        requester_id=current_user.id,
-        addressee_id=target_user.id,
-        status="pending",
-    )
-    db.add(friendship)
-    await db.flush()
-    await db.refresh(friendship)
+    friendship = await insert_friend_request(db, current_user.id, target_user.id)
     
     logger.info(
         "Friend request sent via code",
-        requester_id=str(current_user.id),
-        addressee_id=str(target_user.id),
+        requester_id=current_user.id,
+        addressee_id=target_user.id,
         friend_code=code,
     )
     
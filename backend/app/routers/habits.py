@@ -7,18 +7,21 @@ Endpoints for managing recurring habits:
 - Habit history and archiving
 """
 
-from datetime import date, datetime, timedelta, timezone
+from datetime import date, timedelta
 from typing import Optional
 from uuid import UUID
 
 import structlog
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import and_, func, select
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import and_, delete, exists, func, insert, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
 from app.database import get_db
 from app.models.completion import Completion
 from app.models.habit import Habit
+from app.models.user import User
 from app.schemas.habit import (
     DayOfWeek,
     Frequency,
@@ -28,42 +31,16 @@ from app.schemas.habit import (
     HabitWithProgress,
 )
 from app.schemas.completion import CompletionResponse
-from app.utils.dependencies import CurrentUser
+from app.services.completion_cache import forget_today_completions
+from app.utils.dependencies import CurrentUser, Now
 
 
-def should_show_on_date(habit: Habit, target_date: date) -> bool:
-    """
-    Determine if a habit should be shown/tracked on a specific date.
-    
-    Args:
-        habit: The habit to check
-        target_date: The date to check
-    
-    Returns:
-        True if habit should appear on this date
-    """
-    if habit.is_archived:
-        return False
-    
-    if habit.frequency_type == "daily":
-        return True
-    
-    if habit.frequency_type == "weekly":
-        # Show on first day of week (Monday = 0)
-        return target_date.weekday() == 0
-    
-    if habit.frequency_type == "specific_days":
-        # frequency_days contains weekday indices (0=Mon, 6=Sun)
-        return target_date.weekday() in (habit.frequency_days or [])
-    
-    if habit.frequency_type == "x_per_week":
-        # For x_per_week, always show until target met
-        return True
-    
-    return True
-
 logger = structlog.get_logger()
-router = APIRouter(prefix="/habits", tags=["Habits"])
+router = APIRouter(
+    prefix="/habits",
+    tags=["Habits"],
+    default_response_class=ORJSONResponse,
+)
 
 
 # Helper to map schema enums to model values
@@ -74,6 +51,8 @@ FREQUENCY_MAP = {
     Frequency.X_PER_WEEK: "x_per_week",
 }
 
+FREQUENCY_BY_VALUE = {value: frequency for frequency, value in FREQUENCY_MAP.items()}
+
 DAY_TO_INT = {
     DayOfWeek.MONDAY: 0,
     DayOfWeek.TUESDAY: 1,
@@ -84,32 +63,95 @@ DAY_TO_INT = {
     DayOfWeek.SUNDAY: 6,
 }
 
+INT_TO_DAY = {value: day for day, value in DAY_TO_INT.items()}
 
-def habit_to_response(habit: Habit, completed_today: bool = False) -> HabitResponse:
-    """Convert Habit model to HabitResponse schema."""
-    return HabitResponse(
-        id=habit.id,
-        user_id=habit.user_id,
-        title=habit.name,
-        description=habit.description,
-        icon=habit.icon,
-        color=habit.color,
-        frequency=habit.frequency_type,
-        specific_days=[list(DAY_TO_INT.keys())[list(DAY_TO_INT.values()).index(d)] for d in (habit.frequency_days or [])],
-        times_per_week=habit.frequency_count,
-        reminder_time=habit.reminder_time,
-        base_xp=10,  # Default, could be stored in model
-        base_coins=5,  # Default
-        current_streak=habit.current_streak,
-        best_streak=habit.best_streak,
-        total_completions=habit.total_completions,
-        is_active=not habit.is_archived,
-        completed_today=completed_today,
-        created_at=habit.created_at,
-        updated_at=habit.updated_at,
+# Weekly completion target per frequency type (anything else: once a week)
+WEEK_TARGET_BY_FREQUENCY = {
+    "daily": lambda habit: 7,
+    "x_per_week": lambda habit: habit.frequency_count or 3,
+    "specific_days": lambda habit: len(habit.frequency_days or []),
+    "weekly": lambda habit: 1,
+}
+
+
+def shown_on_date_filter(target_date: date):
+    """WHERE clause for habits scheduled on ``target_date`` (archived habits aside).
+    
+    Daily and x-per-week habits show every day, weekly habits on Mondays
+    and specific-days habits on their listed weekdays (0=Mon, 6=Sun).
+    """
+    weekday = target_date.weekday()
+    conditions = [
+        Habit.frequency_type.not_in(("weekly", "specific_days")),
+        and_(
+            Habit.frequency_type == "specific_days",
+            Habit.frequency_days.any(weekday),
+        ),
+    ]
+    if weekday == 0:
+        conditions.append(Habit.frequency_type == "weekly")
+    return or_(*conditions)
+
+
+async def adjust_active_habits_count(db: AsyncSession, user_id: UUID, delta: int) -> None:
+    """Keep ``User.active_habits_count`` in step with habit create/archive/delete."""
+    await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(active_habits_count=User.active_habits_count + delta)
     )
 
 
+def owned_habit_filter(habit_id: UUID, user_id: UUID):
+    """WHERE clause for a single habit belonging to ``user_id``."""
+    return and_(
+        Habit.id == habit_id,
+        Habit.user_id == user_id,
+    )
+
+
+def completed_on(day: date):
+    """``completed_today`` column: whether the selected habit has a completion on ``day``."""
+    return (
+        exists()
+        .where(
+            Completion.habit_id == Habit.id,
+            Completion.completed_date == day,
+        )
+        .label("completed_today")
+    )
+
+
+def habit_response_fields(habit: Habit, completed_today: bool = False) -> dict:
+    """HabitResponse fields for a Habit, already in their schema types."""
+    return {
+        "id": habit.id,
+        "user_id": habit.user_id,
+        "title": habit.name,
+        "description": habit.description,
+        "icon": habit.icon,
+        "color": habit.color,
+        "frequency": FREQUENCY_BY_VALUE[habit.frequency_type],
+        "specific_days": [INT_TO_DAY[d] for d in (habit.frequency_days or [])],
+        "times_per_week": habit.frequency_count,
+        "reminder_time": habit.reminder_time,
+        "base_xp": 10,  # Default, could be stored in model
+        "base_coins": 5,  # Default
+        "current_streak": habit.current_streak,
+        "best_streak": habit.best_streak,
+        "total_completions": habit.total_completions,
+        "is_active": not habit.is_archived,
+        "completed_today": completed_today,
+        "created_at": habit.created_at,
+        "updated_at": habit.updated_at,
+    }
+
+
+def habit_to_response(habit: Habit, completed_today: bool = False) -> HabitResponse:
+    """Build a HabitResponse from a trusted ORM row without validation."""
+    return HabitResponse.model_construct(**habit_response_fields(habit, completed_today))
+
+
 @router.get(
     "/",
     response_model=list[HabitResponse],
@@ -118,12 +160,19 @@ def habit_to_response(habit: Habit, completed_today: bool = False) -> HabitRespo
 )
 async def list_habits(
     current_user: CurrentUser,
+    clock: Now,
     db: AsyncSession = Depends(get_db),
     include_archived: bool = Query(False, description="Include archived habits"),
     category: Optional[str] = Query(None, description="Filter by category"),
 ) -> list[HabitResponse]:
     """List all habits for the current user."""
-    query = select(Habit).where(Habit.user_id == current_user.id)
+    # Today's completion flag comes back with each habit; the responses never
+    # touch relationships, so the selectin-loaded completions are skipped
+    query = (
+        select(Habit, completed_on(clock.today))
+        .where(Habit.user_id == current_user.id)
+        .options(raiseload("*"))
+    )
     
     if not include_archived:
         query = query.where(Habit.is_archived == False)
@@ -134,24 +183,10 @@ async def list_habits(
     query = query.order_by(Habit.position, Habit.created_at)
     
     result = await db.execute(query)
-    habits = result.scalars().all()
-    
-    # Check today's completions
-    today = date.today()
-    completion_result = await db.execute(
-        select(Completion.habit_id)
-        .where(
-            and_(
-                Completion.user_id == current_user.id,
-                Completion.completed_date == today,
-            )
-        )
-    )
-    completed_habit_ids = {row[0] for row in completion_result.fetchall()}
     
     return [
-        habit_to_response(habit, completed_today=habit.id in completed_habit_ids)
-        for habit in habits
+        habit_to_response(habit, completed_today=completed_today)
+        for habit, completed_today in result.all()
     ]
 
 
@@ -168,34 +203,37 @@ async def create_habit(
     db: AsyncSession = Depends(get_db),
 ) -> HabitResponse:
     """Create a new habit."""
-    # Get max position for ordering
-    result = await db.execute(
-        select(func.max(Habit.position)).where(Habit.user_id == current_user.id)
-    )
-    max_position = result.scalar() or 0
-    
     # Convert specific_days to int list
     frequency_days = []
     if habit_data.specific_days:
         frequency_days = [DAY_TO_INT[day] for day in habit_data.specific_days]
     
-    habit = Habit(
-        user_id=current_user.id,
-        name=habit_data.title,
-        description=habit_data.description,
-        icon=habit_data.icon,
-        color=habit_data.color,
-        frequency_type=FREQUENCY_MAP.get(habit_data.frequency, "daily"),
-        frequency_days=frequency_days,
-        frequency_count=habit_data.times_per_week,
-        reminder_time=habit_data.reminder_time,
-        reminder_enabled=habit_data.reminder_time is not None,
-        position=max_position + 1,
+    # Appended after the user's last habit; the position is computed by the
+    # INSERT itself and the new row comes back through RETURNING
+    next_position = (
+        select(func.coalesce(func.max(Habit.position), 0) + 1)
+        .where(Habit.user_id == current_user.id)
+        .scalar_subquery()
     )
-    
-    db.add(habit)
-    await db.commit()
-    await db.refresh(habit)
+    habit = await db.scalar(
+        insert(Habit)
+        .values(
+            user_id=current_user.id,
+            name=habit_data.title,
+            description=habit_data.description,
+            icon=habit_data.icon,
+            color=habit_data.color,
+            frequency_type=FREQUENCY_MAP.get(habit_data.frequency, "daily"),
+            frequency_days=frequency_days,
+            frequency_count=habit_data.times_per_week,
+            reminder_time=habit_data.reminder_time,
+            reminder_enabled=habit_data.reminder_time is not None,
+            position=next_position,
+        )
+        .returning(Habit)
+        .options(raiseload("*"))
+    )
+    await adjust_active_habits_count(db, current_user.id, 1)
     
     logger.info(
         "Habit created",
@@ -215,89 +253,52 @@ async def create_habit(
 )
 async def get_today_habits(
     current_user: CurrentUser,
+    clock: Now,
     db: AsyncSession = Depends(get_db),
 ) -> list[HabitWithProgress]:
     """Get habits for today based on frequency settings."""
-    today = date.today()
+    today = clock.today
     
-    # Get all active habits
-    result = await db.execute(
-        select(Habit)
-        .where(
-            and_(
-                Habit.user_id == current_user.id,
-                Habit.is_archived == False,
-            )
-        )
-        .order_by(Habit.position, Habit.created_at)
-    )
-    all_habits = result.scalars().all()
-    
-    # Filter habits that should show today
-    today_habits = [h for h in all_habits if should_show_on_date(h, today)]
+    week_start = today - timedelta(days=today.weekday())
     
-    # Get today's completions
-    completion_result = await db.execute(
-        select(Completion.habit_id)
+    # Week completions for progress, counted per habit in the same query
+    week_count = (
+        select(func.count(Completion.id))
         .where(
-            and_(
-                Completion.user_id == current_user.id,
-                Completion.completed_date == today,
-            )
+            Completion.habit_id == Habit.id,
+            Completion.completed_date >= week_start,
+            Completion.completed_date <= today,
         )
+        .scalar_subquery()
+        .label("week_completions")
     )
-    completed_habit_ids = {row[0] for row in completion_result.fetchall()}
     
-    # Get week completions for progress
-    week_start = today - timedelta(days=today.weekday())
-    week_completions_result = await db.execute(
-        select(Completion.habit_id, func.count(Completion.id))
+    # Get active habits that show today, each with today's completion flag
+    # and week count
+    result = await db.execute(
+        select(Habit, completed_on(today), week_count)
         .where(
             and_(
-                Completion.user_id == current_user.id,
-                Completion.completed_date >= week_start,
-                Completion.completed_date <= today,
+                Habit.user_id == current_user.id,
+                Habit.is_archived == False,
+                shown_on_date_filter(today),
             )
         )
-        .group_by(Completion.habit_id)
+        .options(raiseload("*"))
+        .order_by(Habit.position, Habit.created_at)
     )
-    week_completions_map = dict(week_completions_result.fetchall())
+    today_habits = result.all()
     
     responses = []
-    for habit in today_habits:
+    for habit, completed_today, week_completions in today_habits:
         # Calculate week target based on frequency
-        if habit.frequency_type == "daily":
-            week_target = 7
-        elif habit.frequency_type == "x_per_week":
-            week_target = habit.frequency_count or 3
-        elif habit.frequency_type == "specific_days":
-            week_target = len(habit.frequency_days or [])
-        else:
-            week_target = 1
+        week_target_fn = WEEK_TARGET_BY_FREQUENCY.get(habit.frequency_type)
+        week_target = week_target_fn(habit) if week_target_fn else 1
         
-        week_completions = week_completions_map.get(habit.id, 0)
         progress = min((week_completions / week_target) * 100, 100) if week_target > 0 else 0
         
-        response = HabitWithProgress(
-            id=habit.id,
-            user_id=habit.user_id,
-            title=habit.name,
-            description=habit.description,
-            icon=habit.icon,
-            color=habit.color,
-            frequency=habit.frequency_type,
-            specific_days=[list(DAY_TO_INT.keys())[list(DAY_TO_INT.values()).index(d)] for d in (habit.frequency_days or [])],
-            times_per_week=habit.frequency_count,
-            reminder_time=habit.reminder_time,
-            base_xp=10,
-            base_coins=5,
-            current_streak=habit.current_streak,
-            best_streak=habit.best_streak,
-            total_completions=habit.total_completions,
-            is_active=True,
-            completed_today=habit.id in completed_habit_ids,
-            created_at=habit.created_at,
-            updated_at=habit.updated_at,
+        response = HabitWithProgress.model_construct(
+            **habit_response_fields(habit, completed_today),
             week_completions=week_completions,
             week_target=week_target,
             progress_percentage=round(progress, 1),
@@ -316,39 +317,25 @@ async def get_today_habits(
 async def get_habit(
     habit_id: UUID,
     current_user: CurrentUser,
+    clock: Now,
     db: AsyncSession = Depends(get_db),
 ) -> HabitResponse:
     """Get a specific habit by ID."""
+    # The habit, with whether it was completed today
     result = await db.execute(
-        select(Habit).where(
-            and_(
-                Habit.id == habit_id,
-                Habit.user_id == current_user.id,
-            )
-        )
+        select(Habit, completed_on(clock.today))
+        .where(owned_habit_filter(habit_id, current_user.id))
+        .options(raiseload("*"))
     )
-    habit = result.scalar_one_or_none()
+    row = result.first()
     
-    if not habit:
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Habit not found",
         )
     
-    # Check if completed today
-    today = date.today()
-    completion_result = await db.execute(
-        select(Completion.id)
-        .where(
-            and_(
-                Completion.habit_id == habit_id,
-                Completion.completed_date == today,
-            )
-        )
-        .limit(1)
-    )
-    completed_today = completion_result.scalar_one_or_none() is not None
-    
+    habit, completed_today = row
     return habit_to_response(habit, completed_today)
 
 
@@ -362,16 +349,14 @@ async def update_habit(
     habit_id: UUID,
     habit_data: HabitUpdate,
     current_user: CurrentUser,
+    clock: Now,
     db: AsyncSession = Depends(get_db),
 ) -> HabitResponse:
     """Update an existing habit."""
     result = await db.execute(
-        select(Habit).where(
-            and_(
-                Habit.id == habit_id,
-                Habit.user_id == current_user.id,
-            )
-        )
+        select(Habit)
+        .where(owned_habit_filter(habit_id, current_user.id))
+        .options(raiseload("*"))
     )
     habit = result.scalar_one_or_none()
     
@@ -401,16 +386,19 @@ async def update_habit(
     if "reminder_time" in update_data:
         habit.reminder_time = update_data["reminder_time"]
         habit.reminder_enabled = update_data["reminder_time"] is not None
-    if "is_active" in update_data:
+    if "is_active" in update_data and habit.is_archived == update_data["is_active"]:
         habit.is_archived = not update_data["is_active"]
         if habit.is_archived:
-            habit.archived_at = datetime.now(timezone.utc)
+            habit.archived_at = clock.now
         else:
             habit.archived_at = None
+        await adjust_active_habits_count(
+            db, current_user.id, -1 if habit.is_archived else 1
+        )
     
-    habit.updated_at = datetime.now(timezone.utc)
-    await db.commit()
-    await db.refresh(habit)
+    # Every changed column is set here, so nothing needs reading back;
+    # the request's commit writes it
+    habit.updated_at = clock.now
     
     logger.info(
         "Habit updated",
@@ -430,27 +418,30 @@ async def update_habit(
 async def delete_habit(
     habit_id: UUID,
     current_user: CurrentUser,
+    clock: Now,
     db: AsyncSession = Depends(get_db),
 ) -> None:
     """Delete a habit permanently."""
-    result = await db.execute(
-        select(Habit).where(
-            and_(
-                Habit.id == habit_id,
-                Habit.user_id == current_user.id,
-            )
-        )
+    # Completions go with it through the ON DELETE CASCADE foreign key
+    was_archived = await db.scalar(
+        delete(Habit)
+        .where(owned_habit_filter(habit_id, current_user.id))
+        .returning(Habit.is_archived)
     )
-    habit = result.scalar_one_or_none()
     
-    if not habit:
+    if was_archived is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Habit not found",
         )
     
-    await db.delete(habit)
+    if not was_archived:
+        await adjust_active_habits_count(db, current_user.id, -1)
+    
+    # Today's cached completions may list the cascaded rows: commit first so
+    # a concurrent read cannot cache them again after the key is dropped
     await db.commit()
+    await forget_today_completions(current_user.id, clock.today)
     
     logger.info(
         "Habit deleted",
@@ -468,31 +459,34 @@ async def delete_habit(
 async def archive_habit(
     habit_id: UUID,
     current_user: CurrentUser,
+    clock: Now,
     db: AsyncSession = Depends(get_db),
 ) -> HabitResponse:
     """Archive a habit."""
-    result = await db.execute(
-        select(Habit).where(
-            and_(
-                Habit.id == habit_id,
-                Habit.user_id == current_user.id,
-            )
-        )
+    owned = owned_habit_filter(habit_id, current_user.id)
+    
+    # Archive and read the row back in one statement
+    habit = await db.scalar(
+        update(Habit)
+        .where(owned, Habit.is_archived == False)
+        .values(is_archived=True, archived_at=clock.now, updated_at=clock.now)
+        .returning(Habit)
+        .options(raiseload("*"))
+        .execution_options(populate_existing=True)
     )
-    habit = result.scalar_one_or_none()
     
-    if not habit:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Habit not found",
+    if habit is not None:
+        await adjust_active_habits_count(db, current_user.id, -1)
+    else:
+        # Already archived (left as is), or not ours
+        habit = await db.scalar(
+            select(Habit).where(owned).options(raiseload("*"))
         )
-    
-    habit.is_archived = True
-    habit.archived_at = datetime.now(timezone.utc)
-    habit.updated_at = datetime.now(timezone.utc)
-    
-    await db.commit()
-    await db.refresh(habit)
+        if habit is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Habit not found",
+            )
     
     logger.info(
         "Habit archived",
@@ -517,31 +511,25 @@ async def get_habit_history(
     offset: int = Query(0, ge=0, description="Offset for pagination"),
 ) -> list[CompletionResponse]:
     """Get completion history for a habit."""
-    # Verify habit ownership
-    habit_result = await db.execute(
-        select(Habit.id).where(
-            and_(
-                Habit.id == habit_id,
-                Habit.user_id == current_user.id,
-            )
-        )
-    )
-    if not habit_result.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Habit not found",
-        )
+    owned = exists().where(owned_habit_filter(habit_id, current_user.id))
     
-    # Get completions
+    # Get completions, only if the habit belongs to the current user
     result = await db.execute(
         select(Completion)
-        .where(Completion.habit_id == habit_id)
+        .where(Completion.habit_id == habit_id, owned)
         .order_by(Completion.completed_date.desc())
         .offset(offset)
         .limit(limit)
     )
     completions = result.scalars().all()
     
+    # An empty page is either no (more) completions or not our habit
+    if not completions and not await db.scalar(select(owned)):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Habit not found",
+        )
+    
     return [
         CompletionResponse(
             id=c.id,
@@ -6,6 +6,7 @@ Provides endpoints for monitoring service health:
 - /api/health/detailed: Full system health including DB and Redis
 """
 
+import time
 from datetime import datetime, timezone
 from typing import Any, Dict
 
@@ -17,6 +18,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
 from app.database import get_db
+from app.utils.redis_client import get_redis
 
 logger = structlog.get_logger()
 settings = get_settings()
@@ -40,6 +42,27 @@ class DetailedHealthResponse(BaseModel):
     components: Dict[str, Any]
 
 
+# Probe-rate endpoints share one timestamp string per second
+_timestamp_cache = {"at": float("-inf"), "iso": ""}
+
+
+def now_iso() -> str:
+    """Current UTC time in ISO format, re-rendered at most once per second."""
+    now = time.monotonic()
+    if now - _timestamp_cache["at"] >= 1.0:
+        _timestamp_cache["iso"] = datetime.now(timezone.utc).isoformat()
+        _timestamp_cache["at"] = now
+    return _timestamp_cache["iso"]
+
+
+# Constant part of the liveness response, validated once
+_HEALTHY = HealthResponse(
+    status="healthy",
+    timestamp="",
+    version=settings.app_version,
+)
+
+
 @router.get(
     "/health",
     response_model=HealthResponse,
@@ -53,11 +76,7 @@ async def health_check() -> HealthResponse:
     Returns:
         HealthResponse: Status, timestamp, and version
     """
-    return HealthResponse(
-        status="healthy",
-        timestamp=datetime.now(timezone.utc).isoformat(),
-        version=settings.app_version,
-    )
+    return _HEALTHY.model_copy(update={"timestamp": now_iso()})
 
 
 @router.get(
@@ -103,11 +122,7 @@ async def detailed_health_check(
     
     # Check Redis (basic connectivity)
     try:
-        import redis.asyncio as redis
-        
-        redis_client = redis.from_url(settings.redis_url)
-        await redis_client.ping()
-        await redis_client.close()
+        await get_redis().ping()
         components["redis"] = {
             "status": "healthy",
             "type": "redis",
@@ -122,7 +137,7 @@ async def detailed_health_check(
     
     response = DetailedHealthResponse(
         status="healthy" if overall_healthy else "degraded",
-        timestamp=datetime.now(timezone.utc).isoformat(),
+        timestamp=now_iso(),
         version=settings.app_version,
         environment=settings.environment,
         components=components,
@@ -7,9 +7,11 @@ from uuid import UUID
 
 import structlog
 from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from sqlalchemy import func, select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, raiseload, selectinload
 
 from app.deps import CurrentUserWithCharacter, DBSession
 from app.models.character import Character
@@ -18,7 +20,11 @@ from app.models.item import Item
 
 logger = structlog.get_logger()
 
-router = APIRouter(prefix="/inventory", tags=["Inventory"])
+router = APIRouter(
+    prefix="/inventory",
+    tags=["Inventory"],
+    default_response_class=ORJSONResponse,
+)
 
 
 # =============================================================================
@@ -86,6 +92,41 @@ class UnequipResult(BaseModel):
 # Helper Functions
 # =============================================================================
 
+# Inventory responses only read the item; anything else (including the
+# item's own relationships) would be an extra query, so fail loudly instead
+INVENTORY_LOAD_OPTIONS = (
+    selectinload(UserInventory.item).raiseload("*"),
+    raiseload("*"),
+)
+
+# Same, for queries that already JOIN the item (to filter on its columns)
+INVENTORY_JOINED_LOAD_OPTIONS = (
+    contains_eager(UserInventory.item).raiseload("*"),
+    raiseload("*"),
+)
+
+
+
+async def unequip_entry(db: AsyncSession, user_id: UUID, *criteria) -> UserInventory | None:
+    """Unequip a user's equipped entry matching ``criteria``.
+    
+    One UPDATE ... RETURNING: the entry is flipped and read back (with its
+    item, for the response) without a SELECT first. None if no equipped
+    entry matched.
+    """
+    return await db.scalar(
+        update(UserInventory)
+        .where(
+            UserInventory.user_id == user_id,
+            UserInventory.is_equipped == True,
+            *criteria,
+        )
+        .values(is_equipped=False, equipped_slot=None)
+        .returning(UserInventory)
+        .options(*INVENTORY_LOAD_OPTIONS)
+        .execution_options(populate_existing=True)
+    )
+
 
 def inventory_entry_to_response(entry: UserInventory) -> InventoryItemResponse:
     """Convert inventory entry to response model."""
@@ -108,25 +149,24 @@ def inventory_entry_to_response(entry: UserInventory) -> InventoryItemResponse:
     )
 
 
-def calculate_total_bonus(items: list[InventoryItemResponse]) -> dict[str, int]:
-    """Calculate total stat bonuses from equipped items."""
-    totals = {
+def empty_stat_totals() -> dict[str, int]:
+    """Stat bonus accumulator with every stat at zero."""
+    return {
         "strength": 0,
         "endurance": 0,
         "agility": 0,
         "intelligence": 0,
         "charisma": 0,
     }
-    
-    for item in items:
-        if item.is_equipped:
-            totals["strength"] += item.strength_bonus
-            totals["endurance"] += item.endurance_bonus
-            totals["agility"] += item.agility_bonus
-            totals["intelligence"] += item.intelligence_bonus
-            totals["charisma"] += item.charisma_bonus
-    
-    return totals
+
+
+def add_stat_bonus(totals: dict[str, int], item: InventoryItemResponse) -> None:
+    """Add one item's stat bonuses to a running total."""
+    totals["strength"] += item.strength_bonus
+    totals["endurance"] += item.endurance_bonus
+    totals["agility"] += item.agility_bonus
+    totals["intelligence"] += item.intelligence_bonus
+    totals["charisma"] += item.charisma_bonus
 
 
 # =============================================================================
@@ -149,28 +189,37 @@ async def get_inventory(
     """Get user's inventory."""
     query = (
         select(UserInventory)
-        .options(selectinload(UserInventory.item))
+        .join(UserInventory.item)
+        .options(*INVENTORY_JOINED_LOAD_OPTIONS)
         .where(UserInventory.user_id == current_user.id)
     )
     
     if equipped_only:
         query = query.where(UserInventory.is_equipped == True)
     
+    if category:
+        query = query.where(Item.category == category)
+    
     result = await db.execute(query)
-    entries = result.scalars().all()
     
-    # Filter by category in Python (item is loaded via selectinload)
-    if category:
-        entries = [e for e in entries if e.item.category == category]
+    # Every equipped item of the category is in the list whatever the
+    # filters, so the count and stat totals are accumulated while building it
+    items = []
+    equipped_count = 0
+    total_stats_bonus = empty_stat_totals()
     
-    items = [inventory_entry_to_response(e) for e in entries]
-    equipped_items = [i for i in items if i.is_equipped]
+    for entry in result.scalars():
+        response = inventory_entry_to_response(entry)
+        items.append(response)
+        if response.is_equipped:
+            equipped_count += 1
+            add_stat_bonus(total_stats_bonus, response)
     
     return InventoryResponse(
         items=items,
         total=len(items),
-        equipped_count=len(equipped_items),
-        total_stats_bonus=calculate_total_bonus(items),
+        equipped_count=equipped_count,
+        total_stats_bonus=total_stats_bonus,
     )
 
 
@@ -188,10 +237,11 @@ async def equip_item(
     """Equip an item from inventory."""
     character = current_user.character
     
-    # Get inventory entry
+    # Get inventory entry (item JOINed in: one query for a single row)
     result = await db.execute(
         select(UserInventory)
-        .options(selectinload(UserInventory.item))
+        .join(UserInventory.item)
+        .options(*INVENTORY_JOINED_LOAD_OPTIONS)
         .where(
             UserInventory.id == inventory_id,
             UserInventory.user_id == current_user.id,
@@ -235,19 +285,11 @@ async def equip_item(
     
     if current_equipped_id:
         # Unequip current item
-        current_result = await db.execute(
-            select(UserInventory)
-            .options(selectinload(UserInventory.item))
-            .where(
-                UserInventory.user_id == current_user.id,
-                UserInventory.item_id == current_equipped_id,
-                UserInventory.is_equipped == True,
-            )
+        current_entry = await unequip_entry(
+            db, current_user.id, UserInventory.equipped_slot == slot
         )
-        current_entry = current_result.scalar_one_or_none()
         
         if current_entry:
-            current_entry.unequip()
             unequipped_response = inventory_entry_to_response(current_entry)
     
     # Equip new item
@@ -309,17 +351,10 @@ async def unequip_item(
             detail=f"No item equipped in {slot} slot",
         )
     
-    # Find inventory entry
-    result = await db.execute(
-        select(UserInventory)
-        .options(selectinload(UserInventory.item))
-        .where(
-            UserInventory.user_id == current_user.id,
-            UserInventory.item_id == equipped_id,
-            UserInventory.is_equipped == True,
-        )
+    # Unequip the inventory entry
+    entry = await unequip_entry(
+        db, current_user.id, UserInventory.item_id == equipped_id
     )
-    entry = result.scalar_one_or_none()
     
     if not entry:
         raise HTTPException(
@@ -327,8 +362,6 @@ async def unequip_item(
             detail="Equipped item not found in inventory",
         )
     
-    # Unequip
-    entry.unequip()
     setattr(character, slot_field_map[slot], None)
     
     await db.flush()
@@ -360,10 +393,12 @@ async def get_equipped_items(
     """Get currently equipped items."""
     character = current_user.character
     
-    # Get all equipped inventory entries
+    # Get all equipped inventory entries (at most one per slot, so the
+    # item is JOINed in rather than fetched by a second query)
     result = await db.execute(
         select(UserInventory)
-        .options(selectinload(UserInventory.item))
+        .join(UserInventory.item)
+        .options(*INVENTORY_JOINED_LOAD_OPTIONS)
         .where(
             UserInventory.user_id == current_user.id,
             UserInventory.is_equipped == True,
@@ -380,10 +415,10 @@ async def get_equipped_items(
         "pet": None,
     }
     
-    items = []
+    total_stats_bonus = empty_stat_totals()
     for entry in entries:
         response = inventory_entry_to_response(entry)
-        items.append(response)
+        add_stat_bonus(total_stats_bonus, response)
         if entry.equipped_slot in equipped:
             equipped[entry.equipped_slot] = response
     
@@ -393,5 +428,5 @@ async def get_equipped_items(
         helmet=equipped["helmet"],
         accessory=equipped["accessory"],
         pet=equipped["pet"],
-        total_stats_bonus=calculate_total_bonus(items),
+        total_stats_bonus=total_stats_bonus,
     )
@@ -11,21 +11,21 @@ Uses Redis sorted sets for performance when available,
 falls back to SQL queries with caching.
 """
 
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from typing import Annotated
 from uuid import UUID
 
-import redis.asyncio as redis
 import structlog
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import and_, func, or_, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import ORJSONResponse
+from redis.exceptions import RedisError
+from sqlalchemy import func, select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, raiseload
 
-from app.config import get_settings
 from app.database import get_db
 from app.models.combat import Combat
 from app.models.completion import Completion
-from app.models.friendship import Friendship
 from app.models.habit import Habit
 from app.models.stats import DailyStats
 from app.models.user import User
@@ -34,12 +34,31 @@ from app.schemas.stats import (
     LeaderboardResponse,
     TimeRange,
 )
+from app.services.friend_service import get_friend_ids
+from app.services.leaderboard_service import (
+    get_cached_board,
+    get_friends_weekly_xp,
+    store_cached_board,
+)
 from app.deps import CurrentUser
+from app.utils.redis_client import get_redis
 
 logger = structlog.get_logger()
-settings = get_settings()
 
-router = APIRouter(prefix="/leaderboard", tags=["leaderboard"])
+router = APIRouter(
+    prefix="/leaderboard",
+    tags=["leaderboard"],
+    default_response_class=ORJSONResponse,
+)
+
+
+# Entries only read the user and their character: the one-to-one character
+# is JOINed in, and every other (selectin by default) relationship of both
+# is refused rather than loaded
+LEADERBOARD_USER_OPTIONS = (
+    joinedload(User.character).raiseload("*"),
+    raiseload("*"),
+)
 
 
 # ============================================================================
@@ -49,36 +68,19 @@ router = APIRouter(prefix="/leaderboard", tags=["leaderboard"])
 
 async def get_friend_ids_with_self(db: AsyncSession, user_id: UUID) -> list[UUID]:
     """Get list of friend user IDs including the user themselves."""
-    result = await db.execute(
-        select(Friendship).where(
-            and_(
-                or_(
-                    Friendship.requester_id == user_id,
-                    Friendship.addressee_id == user_id,
-                ),
-                Friendship.status == "accepted",
-            )
-        )
-    )
-    friendships = result.scalars().all()
-    
-    friend_ids = [user_id]  # Include self
-    for f in friendships:
-        friend_id = f.addressee_id if f.requester_id == user_id else f.requester_id
-        friend_ids.append(friend_id)
-    
-    return friend_ids
+    # Shares the friend service's short-lived cache, which is invalidated
+    # whenever a friendship is accepted or removed
+    return [user_id, *await get_friend_ids(db, user_id)]
 
 
-async def get_redis_client() -> redis.Redis | None:
-    """Get Redis client, return None if unavailable."""
-    try:
-        client = redis.from_url(settings.redis_url)
-        await client.ping()
-        return client
-    except Exception as e:
-        logger.warning("Redis unavailable, using SQL fallback", error=str(e))
-        return None
+async def get_users_by_id(db: AsyncSession, user_ids: list[UUID]) -> dict[UUID, User]:
+    """Load the ranked users (with their character) in a single query."""
+    result = await db.execute(
+        select(User)
+        .where(User.id.in_(user_ids))
+        .options(*LEADERBOARD_USER_OPTIONS)
+    )
+    return {user.id: user for user in result.scalars()}
 
 
 def build_leaderboard_entry(
@@ -105,54 +107,97 @@ def build_leaderboard_entry(
     )
 
 
+async def read_cached_board(user_id: UUID, board: str) -> Response | None:
+    """Return the board as built for ``user_id`` in the last minute, if any.
+    
+    Boards are cached in Redis so both workers serve the same copy, and
+    friendship changes or the nightly rebuild can drop it; updated_at
+    tells clients how fresh it is.
+    """
+    try:
+        cached = await get_cached_board(get_redis(), user_id, board)
+    except RedisError as e:
+        logger.warning("Redis unavailable, building leaderboard", error=str(e))
+        return None
+    
+    if cached is None:
+        return None
+    return Response(content=cached, media_type="application/json")
+
+
+async def store_board(
+    user_id: UUID, board: str, response: LeaderboardResponse
+) -> None:
+    """Cache a built board for ``user_id`` (best effort)."""
+    try:
+        await store_cached_board(
+            get_redis(), user_id, board, response.model_dump_json()
+        )
+    except RedisError as e:
+        logger.warning("Could not cache leaderboard", error=str(e))
+
+
 # ============================================================================
 # XP Leaderboards
 # ============================================================================
 
 
-@router.get(
-    "/xp/weekly",
-    response_model=LeaderboardResponse,
-    summary="Weekly XP Leaderboard",
-    description="Get friends leaderboard by XP earned this week",
-)
-async def get_weekly_xp_leaderboard(
-    current_user: CurrentUser,
-    db: AsyncSession = Depends(get_db),
-    limit: int = Query(20, ge=1, le=100),
-) -> LeaderboardResponse:
-    """Get weekly XP leaderboard among friends."""
+async def build_xp_leaderboard(
+    db: AsyncSession,
+    current_user: User,
+    limit: int,
+    start_date: date,
+    time_range: TimeRange,
+) -> LeaderboardResponse | Response:
+    """Build the XP leaderboard among friends since ``start_date``.
+    
+    Weekly and monthly boards only differ by their start date, so they
+    share this body (and the same compiled aggregate statement).
+    """
+    board = f"xp:{time_range.value}:{limit}:{start_date.isoformat()}"
+    cached = await read_cached_board(current_user.id, board)
+    if cached is not None:
+        return cached
+    
     friend_ids = await get_friend_ids_with_self(db, current_user.id)
     
-    # Calculate week start (Monday)
-    today = datetime.now(timezone.utc).date()
-    week_start = today - timedelta(days=today.weekday())
+    # The weekly board is served from its Redis sorted set once built
+    redis_board = None
+    if time_range == TimeRange.WEEK:
+        try:
+            redis_board = await get_friends_weekly_xp(
+                get_redis(), current_user.id, friend_ids, start_date, limit
+            )
+        except RedisError as e:
+            logger.warning("Redis unavailable, using SQL fallback", error=str(e))
     
-    # Aggregate XP from daily stats
-    result = await db.execute(
-        select(
-            DailyStats.user_id,
-            func.sum(DailyStats.xp_earned).label("total_xp"),
-        )
-        .where(
-            DailyStats.user_id.in_(friend_ids),
-            DailyStats.date >= week_start,
+    if redis_board is not None:
+        rankings, user_rank = redis_board
+    else:
+        # Aggregate XP from daily stats
+        result = await db.execute(
+            select(
+                DailyStats.user_id,
+                func.sum(DailyStats.xp_earned).label("total_xp"),
+            )
+            .where(
+                DailyStats.user_id.in_(friend_ids),
+                DailyStats.date >= start_date,
+            )
+            .group_by(DailyStats.user_id)
+            .order_by(func.sum(DailyStats.xp_earned).desc())
+            .limit(limit)
         )
-        .group_by(DailyStats.user_id)
-        .order_by(func.sum(DailyStats.xp_earned).desc())
-        .limit(limit)
-    )
-    rankings = result.all()
+        rankings = result.all()
+        user_rank = None
     
     # Build entries
     entries = []
-    user_rank = None
+    
+    users = await get_users_by_id(db, [user_id for user_id, _ in rankings])
     
     for rank, (user_id, total_xp) in enumerate(rankings, 1):
-        user_result = await db.execute(
-            select(User).where(User.id == user_id)
-        )
-        user = user_result.scalar_one_or_none()
+        user = users.get(user_id)
         
         if user:
             entry = build_leaderboard_entry(
@@ -163,14 +208,37 @@ async def get_weekly_xp_leaderboard(
             if user_id == current_user.id:
                 user_rank = rank
     
-    return LeaderboardResponse(
+    response = LeaderboardResponse(
         leaderboard_type="xp",
-        time_range=TimeRange.WEEK,
+        time_range=time_range,
         entries=entries,
         user_rank=user_rank,
         total_participants=len(friend_ids),
         updated_at=datetime.now(timezone.utc),
     )
+    await store_board(current_user.id, board, response)
+    return response
+
+
+@router.get(
+    "/xp/weekly",
+    response_model=LeaderboardResponse,
+    summary="Weekly XP Leaderboard",
+    description="Get friends leaderboard by XP earned this week",
+)
+async def get_weekly_xp_leaderboard(
+    current_user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(20, ge=1, le=100),
+) -> LeaderboardResponse | Response:
+    """Get weekly XP leaderboard among friends."""
+    # Calculate week start (Monday)
+    today = datetime.now(timezone.utc).date()
+    week_start = today - timedelta(days=today.weekday())
+    
+    return await build_xp_leaderboard(
+        db, current_user, limit, week_start, TimeRange.WEEK
+    )
 
 
 @router.get(
@@ -183,56 +251,14 @@ async def get_monthly_xp_leaderboard(
     current_user: CurrentUser,
     db: AsyncSession = Depends(get_db),
     limit: int = Query(20, ge=1, le=100),
-) -> LeaderboardResponse:
+) -> LeaderboardResponse | Response:
     """Get monthly XP leaderboard among friends."""
-    friend_ids = await get_friend_ids_with_self(db, current_user.id)
-    
     # Calculate month start
     today = datetime.now(timezone.utc).date()
     month_start = today.replace(day=1)
     
-    # Aggregate XP from daily stats
-    result = await db.execute(
-        select(
-            DailyStats.user_id,
-            func.sum(DailyStats.xp_earned).label("total_xp"),
-        )
-        .where(
-            DailyStats.user_id.in_(friend_ids),
-            DailyStats.date >= month_start,
-        )
-        .group_by(DailyStats.user_id)
-        .order_by(func.sum(DailyStats.xp_earned).desc())
-        .limit(limit)
-    )
-    rankings = result.all()
-    
-    # Build entries
-    entries = []
-    user_rank = None
-    
-    for rank, (user_id, total_xp) in enumerate(rankings, 1):
-        user_result = await db.execute(
-            select(User).where(User.id == user_id)
-        )
-        user = user_result.scalar_one_or_none()
-        
-        if user:
-            entry = build_leaderboard_entry(
-                user, rank, float(total_xp or 0), "XP", current_user.id
-            )
-            entries.append(entry)
-            
-            if user_id == current_user.id:
-                user_rank = rank
-    
-    return LeaderboardResponse(
-        leaderboard_type="xp",
-        time_range=TimeRange.MONTH,
-        entries=entries,
-        user_rank=user_rank,
-        total_participants=len(friend_ids),
-        updated_at=datetime.now(timezone.utc),
+    return await build_xp_leaderboard(
+        db, current_user, limit, month_start, TimeRange.MONTH
     )
 
 
@@ -251,8 +277,13 @@ async def get_streak_leaderboard(
     current_user: CurrentUser,
     db: AsyncSession = Depends(get_db),
     limit: int = Query(20, ge=1, le=100),
-) -> LeaderboardResponse:
+) -> LeaderboardResponse | Response:
     """Get streak leaderboard among friends."""
+    board = f"streak:{limit}"
+    cached = await read_cached_board(current_user.id, board)
+    if cached is not None:
+        return cached
+    
     friend_ids = await get_friend_ids_with_self(db, current_user.id)
     
     # Get users ordered by current streak
@@ -261,6 +292,7 @@ async def get_streak_leaderboard(
         .where(User.id.in_(friend_ids))
         .order_by(User.current_streak.desc())
         .limit(limit)
+        .options(*LEADERBOARD_USER_OPTIONS)
     )
     users = result.scalars().all()
     
@@ -277,7 +309,7 @@ async def get_streak_leaderboard(
         if user.id == current_user.id:
             user_rank = rank
     
-    return LeaderboardResponse(
+    response = LeaderboardResponse(
         leaderboard_type="streak",
         time_range=TimeRange.ALL_TIME,
         entries=entries,
@@ -285,6 +317,8 @@ async def get_streak_leaderboard(
         total_participants=len(friend_ids),
         updated_at=datetime.now(timezone.utc),
     )
+    await store_board(current_user.id, board, response)
+    return response
 
 
 # ============================================================================
@@ -302,19 +336,28 @@ async def get_completion_leaderboard(
     current_user: CurrentUser,
     db: AsyncSession = Depends(get_db),
     limit: int = Query(20, ge=1, le=100),
-) -> LeaderboardResponse:
+) -> LeaderboardResponse | Response:
     """Get completion rate leaderboard among friends (last 30 days)."""
-    friend_ids = await get_friend_ids_with_self(db, current_user.id)
-    
     # Calculate date range
     today = datetime.now(timezone.utc).date()
     start_date = today - timedelta(days=30)
     
-    # Aggregate completion rates from daily stats
-    result = await db.execute(
+    board = f"completion:{limit}:{start_date.isoformat()}"
+    cached = await read_cached_board(current_user.id, board)
+    if cached is not None:
+        return cached
+    
+    friend_ids = await get_friend_ids_with_self(db, current_user.id)
+    
+    # Aggregate completion rates from daily stats: completed over scheduled
+    # habits for the whole window, computed once and ordered by its alias
+    completion_rates = (
         select(
             DailyStats.user_id,
-            func.avg(DailyStats.habits_completed * 100.0 / func.nullif(DailyStats.habits_total, 0)).label("avg_completion"),
+            (
+                func.sum(DailyStats.habits_completed) * 100.0
+                / func.nullif(func.sum(DailyStats.habits_total), 0)
+            ).label("avg_completion"),
         )
         .where(
             DailyStats.user_id.in_(friend_ids),
@@ -322,7 +365,11 @@ async def get_completion_leaderboard(
             DailyStats.habits_total > 0,  # Only count days with habits
         )
         .group_by(DailyStats.user_id)
-        .order_by(func.avg(DailyStats.habits_completed * 100.0 / func.nullif(DailyStats.habits_total, 0)).desc())
+        .subquery()
+    )
+    result = await db.execute(
+        select(completion_rates.c.user_id, completion_rates.c.avg_completion)
+        .order_by(completion_rates.c.avg_completion.desc().nullslast())
         .limit(limit)
     )
     rankings = result.all()
@@ -331,11 +378,10 @@ async def get_completion_leaderboard(
     entries = []
     user_rank = None
     
+    users = await get_users_by_id(db, [user_id for user_id, _ in rankings])
+    
     for rank, (user_id, avg_completion) in enumerate(rankings, 1):
-        user_result = await db.execute(
-            select(User).where(User.id == user_id)
-        )
-        user = user_result.scalar_one_or_none()
+        user = users.get(user_id)
         
         if user:
             entry = build_leaderboard_entry(
@@ -346,7 +392,7 @@ async def get_completion_leaderboard(
             if user_id == current_user.id:
                 user_rank = rank
     
-    return LeaderboardResponse(
+    response = LeaderboardResponse(
         leaderboard_type="completion",
         time_range=TimeRange.MONTH,
         entries=entries,
@@ -354,6 +400,8 @@ async def get_completion_leaderboard(
         total_participants=len(friend_ids),
         updated_at=datetime.now(timezone.utc),
     )
+    await store_board(current_user.id, board, response)
+    return response
 
 
 # ============================================================================
@@ -371,54 +419,69 @@ async def get_pvp_leaderboard(
     current_user: CurrentUser,
     db: AsyncSession = Depends(get_db),
     limit: int = Query(20, ge=1, le=100),
-) -> LeaderboardResponse:
+) -> LeaderboardResponse | Response:
     """Get PvP win ratio leaderboard among friends."""
-    friend_ids = await get_friend_ids_with_self(db, current_user.id)
+    board = f"pvp:{limit}"
+    cached = await read_cached_board(current_user.id, board)
+    if cached is not None:
+        return cached
     
-    # Calculate win ratios from combats table
-    # Using subqueries for wins and total combats
+    friend_ids = await get_friend_ids_with_self(db, current_user.id)
     
-    rankings = []
+    # Win ratios in one grouped query: each completed combat counts once
+    # for each friend taking part in it
+    participations = union_all(
+        select(
+            Combat.challenger_id.label("user_id"),
+            (Combat.winner_id == Combat.challenger_id).label("won"),
+        ).where(
+            Combat.status == "completed",
+            Combat.challenger_id.in_(friend_ids),
+        ),
+        select(
+            Combat.defender_id.label("user_id"),
+            (Combat.winner_id == Combat.defender_id).label("won"),
+        ).where(
+            Combat.status == "completed",
+            Combat.defender_id.in_(friend_ids),
+        ),
+    ).subquery()
+    wins = func.count().filter(participations.c.won)
+    win_ratio = wins * 100.0 / func.count()
     
-    for user_id in friend_ids:
-        # Count wins
-        wins_result = await db.execute(
-            select(func.count(Combat.id)).where(
-                Combat.winner_id == user_id,
-                Combat.status == "completed",
-            )
-        )
-        wins = wins_result.scalar() or 0
-        
-        # Count total combats
-        total_result = await db.execute(
-            select(func.count(Combat.id)).where(
-                or_(
-                    Combat.challenger_id == user_id,
-                    Combat.defender_id == user_id,
-                ),
-                Combat.status == "completed",
-            )
+    result = await db.execute(
+        select(
+            participations.c.user_id,
+            win_ratio.label("win_ratio"),
+            wins.label("wins"),
+            func.count().label("total"),
         )
-        total = total_result.scalar() or 0
-        
-        # Calculate ratio
-        win_ratio = (wins / total * 100) if total > 0 else 0
-        rankings.append((user_id, win_ratio, wins, total))
+        .group_by(participations.c.user_id)
+        .order_by(win_ratio.desc(), wins.desc())
+        .limit(limit)
+    )
+    rankings = [
+        (user_id, float(ratio), wins_count, total)
+        for user_id, ratio, wins_count, total in result
+    ]
     
-    # Sort by win ratio (and wins as tiebreaker)
-    rankings.sort(key=lambda x: (x[1], x[2]), reverse=True)
+    # Friends without any completed combat close the board at 0%
+    ranked_ids = {ranking[0] for ranking in rankings}
+    rankings.extend(
+        (user_id, 0.0, 0, 0)
+        for user_id in friend_ids
+        if user_id not in ranked_ids
+    )
     rankings = rankings[:limit]
     
     # Build entries
     entries = []
     user_rank = None
     
+    users = await get_users_by_id(db, [ranking[0] for ranking in rankings])
+    
     for rank, (user_id, win_ratio, wins, total) in enumerate(rankings, 1):
-        user_result = await db.execute(
-            select(User).where(User.id == user_id)
-        )
-        user = user_result.scalar_one_or_none()
+        user = users.get(user_id)
         
         if user:
             entry = build_leaderboard_entry(
@@ -429,7 +492,7 @@ async def get_pvp_leaderboard(
             if user_id == current_user.id:
                 user_rank = rank
     
-    return LeaderboardResponse(
+    response = LeaderboardResponse(
         leaderboard_type="pvp",
         time_range=TimeRange.ALL_TIME,
         entries=entries,
@@ -437,3 +500,5 @@ async def get_pvp_leaderboard(
         total_participants=len(friend_ids),
         updated_at=datetime.now(timezone.utc),
     )
+    await store_board(current_user.id, board, response)
+    return response
@@ -146,7 +146,7 @@ async def list_shop_items(
     owned_result = await db.execute(
         select(UserInventory.item_id).where(UserInventory.user_id == current_user.id)
     )
-    owned_ids = {row[0] for row in owned_result.fetchall()}
+    owned_ids = set(owned_result.scalars())
     
     # Build response
     shop_items = []
@@ -400,7 +400,7 @@ async def get_featured_items(
     owned_result = await db.execute(
         select(UserInventory.item_id).where(UserInventory.user_id == current_user.id)
     )
-    owned_ids = {row[0] for row in owned_result.fetchall()}
+    owned_ids = set(owned_result.scalars())
     
     featured = []
     for item in items:
@@ -10,6 +10,7 @@ Endpoints for user statistics:
 - Data export
 """
 
+import asyncio
 import csv
 import io
 import json
@@ -21,12 +22,13 @@ from uuid import UUID, uuid4
 
 import structlog
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
 from app.config import get_settings
-from app.database import get_db
+from app.database import async_session_maker, get_db
 from app.models.badge import UserBadge
 from app.models.completion import Completion
 from app.models.habit import Habit
@@ -47,7 +49,11 @@ from app.deps import CurrentUser
 logger = structlog.get_logger()
 settings = get_settings()
 
-router = APIRouter(prefix="/stats", tags=["stats"])
+router = APIRouter(
+    prefix="/stats",
+    tags=["stats"],
+    default_response_class=ORJSONResponse,
+)
 
 
 # ============================================================================
@@ -74,6 +80,11 @@ def get_date_range(time_range: TimeRange) -> tuple[date, date]:
         return date(2020, 1, 1), today
 
 
+def period_sum(column, period):
+    """SUM of ``column`` over the rows matching ``period`` (0 when none)."""
+    return func.coalesce(func.sum(column).filter(period), 0)
+
+
 class ExportFormat(str, Enum):
     """Export format options."""
     JSON = "json"
@@ -99,62 +110,64 @@ async def get_stats_overview(
     """Get overall statistics for the user."""
     start_date, end_date = get_date_range(time_range)
     
-    # Get daily stats for the period
-    result = await db.execute(
-        select(DailyStats).where(
-            DailyStats.user_id == current_user.id,
-            DailyStats.date >= start_date,
-            DailyStats.date <= end_date,
-        ).order_by(DailyStats.date)
+    # Trend is measured against the previous period of the same length
+    period_days = (end_date - start_date).days + 1
+    prev_start = start_date - timedelta(days=period_days)
+    
+    # Current and previous period totals in one pass over daily stats
+    in_period = DailyStats.date >= start_date
+    in_prev = DailyStats.date < start_date
+    
+    totals_query = select(
+        period_sum(DailyStats.habits_completed, in_period),
+        period_sum(DailyStats.tasks_completed, in_period),
+        period_sum(DailyStats.xp_earned, in_period),
+        period_sum(DailyStats.coins_earned, in_period),
+        func.count().filter(in_period, DailyStats.completion_rate == 100),
+        func.count().filter(in_period, DailyStats.habits_completed > 0),
+        period_sum(DailyStats.habits_total, in_period),
+        period_sum(DailyStats.habits_total, in_prev),
+        period_sum(DailyStats.habits_completed, in_prev),
+        period_sum(DailyStats.xp_earned, in_prev),
+    ).where(
+        DailyStats.user_id == current_user.id,
+        DailyStats.date >= prev_start,
+        DailyStats.date <= end_date,
     )
-    daily_stats = result.scalars().all()
     
-    # Calculate aggregates
-    total_completions = sum(ds.habits_completed for ds in daily_stats)
-    total_tasks = sum(ds.tasks_completed for ds in daily_stats)
-    total_xp = sum(ds.xp_earned for ds in daily_stats)
-    total_coins = sum(ds.coins_earned for ds in daily_stats)
-    perfect_days = sum(1 for ds in daily_stats if ds.completion_rate == 100)
-    days_with_activity = sum(1 for ds in daily_stats if ds.habits_completed > 0)
+    # The habit lookups are independent of the totals: each runs on its own
+    # session so the three queries overlap
+    async with async_session_maker() as best_db, async_session_maker() as most_db:
+        totals_result, best_habit, most_completed = await asyncio.gather(
+            db.execute(totals_query),
+            _get_best_habit(best_db, current_user.id, start_date, end_date),
+            _get_most_completed_habit(most_db, current_user.id, start_date, end_date),
+        )
+    
+    (
+        total_completions,
+        total_tasks,
+        total_xp,
+        total_coins,
+        perfect_days,
+        days_with_activity,
+        total_scheduled,
+        prev_scheduled,
+        prev_completed,
+        prev_xp,
+    ) = totals_result.one()
     
     # Overall completion rate
-    total_scheduled = sum(ds.habits_total for ds in daily_stats)
     overall_rate = (total_completions / total_scheduled * 100) if total_scheduled > 0 else 0
     
-    # Get active habits count
-    habits_result = await db.execute(
-        select(func.count(Habit.id)).where(
-            Habit.user_id == current_user.id,
-            Habit.is_archived == False,
-        )
-    )
-    total_habits = habits_result.scalar() or 0
-    
-    # Best habit (highest completion rate)
-    best_habit = await _get_best_habit(db, current_user.id, start_date, end_date)
-    most_completed = await _get_most_completed_habit(db, current_user.id, start_date, end_date)
+    # Active habits are counted on the user row
+    total_habits = current_user.active_habits_count
     
     # Calculate trend vs previous period
-    period_days = (end_date - start_date).days + 1
-    prev_start = start_date - timedelta(days=period_days)
-    prev_end = start_date - timedelta(days=1)
-    
-    prev_result = await db.execute(
-        select(DailyStats).where(
-            DailyStats.user_id == current_user.id,
-            DailyStats.date >= prev_start,
-            DailyStats.date <= prev_end,
-        )
-    )
-    prev_stats = prev_result.scalars().all()
-    
-    prev_scheduled = sum(ds.habits_total for ds in prev_stats)
-    prev_completed = sum(ds.habits_completed for ds in prev_stats)
     prev_rate = (prev_completed / prev_scheduled * 100) if prev_scheduled > 0 else 0
     
     completion_trend = overall_rate - prev_rate
     
-    prev_xp = sum(ds.xp_earned for ds in prev_stats)
     xp_trend = ((total_xp - prev_xp) / prev_xp * 100) if prev_xp > 0 else 0
     
     return StatsOverview(
@@ -185,49 +198,50 @@ async def _get_best_habit(
     end_date: date,
 ) -> HabitStat | None:
     """Get habit with highest completion rate."""
-    habits_result = await db.execute(
-        select(Habit).where(
+    # Every habit is measured over the same days, so the highest rate is
+    # the highest completion count: one grouped query picks it
+    completion_count = func.count(Completion.id)
+    result = await db.execute(
+        select(Habit, completion_count)
+        .outerjoin(
+            Completion,
+            and_(
+                Completion.habit_id == Habit.id,
+                Completion.completed_date >= start_date,
+                Completion.completed_date <= end_date,
+            ),
+        )
+        .where(
             Habit.user_id == user_id,
             Habit.is_archived == False,
         )
+        .group_by(Habit.id)
+        .order_by(completion_count.desc())
+        .limit(1)
+        .options(raiseload("*"))
     )
-    habits = habits_result.scalars().all()
+    row = result.first()
     
-    if not habits:
+    if not row:
         return None
     
-    best = None
-    best_rate = -1
+    habit, completions = row
     
-    for habit in habits:
-        completions_result = await db.execute(
-            select(func.count(Completion.id)).where(
-                Completion.habit_id == habit.id,
-                Completion.completed_date >= start_date,
-                Completion.completed_date <= end_date,
-            )
-        )
-        completions = completions_result.scalar() or 0
-        
-        # Calculate expected completions (simplified: daily habit)
-        days = (end_date - start_date).days + 1
-        rate = (completions / days * 100) if days > 0 else 0
-        
-        if rate > best_rate:
-            best_rate = rate
-            best = HabitStat(
-                habit_id=habit.id,
-                habit_name=habit.name,
-                icon=habit.icon or "📌",
-                total_completions=completions,
-                current_streak=habit.current_streak,
-                best_streak=habit.best_streak,
-                completion_rate=round(rate, 1),
-                total_xp_earned=habit.total_xp_earned,
-                average_mood=None,
-            )
+    # Calculate expected completions (simplified: daily habit)
+    days = (end_date - start_date).days + 1
+    rate = (completions / days * 100) if days > 0 else 0
     
-    return best
+    return HabitStat(
+        habit_id=habit.id,
+        habit_name=habit.name,
+        icon=habit.icon or "📌",
+        total_completions=completions,
+        current_streak=habit.current_streak,
+        best_streak=habit.best_streak,
+        completion_rate=round(rate, 1),
+        total_xp_earned=habit.total_xp_earned,
+        average_mood=None,
+    )
 
 
 async def _get_most_completed_habit(
@@ -237,32 +251,26 @@ async def _get_most_completed_habit(
     end_date: date,
 ) -> HabitStat | None:
     """Get habit completed most often."""
+    completion_count = func.count(Completion.id)
     result = await db.execute(
-        select(
-            Completion.habit_id,
-            func.count(Completion.id).label("count"),
-        )
-        .join(Habit, Habit.id == Completion.habit_id)
+        select(Habit, completion_count)
+        .join(Completion, Completion.habit_id == Habit.id)
         .where(
             Habit.user_id == user_id,
             Completion.completed_date >= start_date,
             Completion.completed_date <= end_date,
         )
-        .group_by(Completion.habit_id)
-        .order_by(func.count(Completion.id).desc())
+        .group_by(Habit.id)
+        .order_by(completion_count.desc())
         .limit(1)
+        .options(raiseload("*"))
     )
     row = result.first()
     
     if not row:
         return None
     
-    habit_id, count = row
-    
-    habit_result = await db.execute(
-        select(Habit).where(Habit.id == habit_id)
-    )
-    habit = habit_result.scalar_one()
+    habit, count = row
     
     days = (end_date - start_date).days + 1
     rate = (count / days * 100) if days > 0 else 0
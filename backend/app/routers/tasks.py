@@ -31,7 +31,7 @@ from app.schemas.task import (
     TaskWithEvaluation,
     TaskEvaluation,
 )
-from app.services.xp_service import calculate_task_xp, add_xp
+from app.services.xp_service import calculate_task_xp, add_xp_async
 from app.services.streak_service import get_streak_multiplier
 from app.tasks.llm_tasks import evaluate_task_difficulty, reevaluate_task
 from app.utils.dependencies import CurrentUser
@@ -474,8 +474,8 @@ async def complete_task(
     coins_earned = int(xp_earned * 0.5)  # Coins = 50% of XP
     
     # Add XP to user (this handles level up checks)
-    add_xp(
-        db=db,  # type: ignore - async session compatibility
+    await add_xp_async(
+        db=db,
         user=current_user,
         amount=xp_earned,
         source_type="task",
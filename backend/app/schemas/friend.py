@@ -202,6 +202,10 @@ class FriendListResponse(BaseModel):
         ge=0,
         description="Number of friends currently online"
     )
+    next_cursor: str | None = Field(
+        default=None,
+        description="Cursor for the next page, null on the last page"
+    )
 
 
 class PendingRequestsResponse(BaseModel):
@@ -225,6 +229,14 @@ class PendingRequestsResponse(BaseModel):
         ge=0,
         description="Number of outgoing requests"
     )
+    incoming_next_cursor: str | None = Field(
+        default=None,
+        description="Cursor for the next page of incoming requests, null on the last page"
+    )
+    outgoing_next_cursor: str | None = Field(
+        default=None,
+        description="Cursor for the next page of outgoing requests, null on the last page"
+    )
 
 
 class FriendActionRequest(BaseModel):
@@ -12,6 +12,7 @@ class ItemCategory(str, Enum):
     
     WEAPON = "weapon"
     ARMOR = "armor"
+    HELMET = "helmet"
     ACCESSORY = "accessory"
     CONSUMABLE = "consumable"
     PET = "pet"
@@ -16,6 +16,7 @@ from app.services.xp_service import (
     apply_streak_multiplier,
     apply_intelligence_bonus,
     add_xp,
+    add_xp_async,
     check_level_up,
     get_xp_progress,
 )
@@ -35,6 +36,7 @@ from app.services.streak_service import (
     use_streak_freeze,
     add_streak_freeze,
     get_streak_multiplier,
+    get_streak_multiplier_decimal,
     check_streak_badges,
     get_streak_status,
     calculate_streak_recovery_cost,
@@ -70,6 +72,7 @@ __all__ = [
     "apply_streak_multiplier",
     "apply_intelligence_bonus",
     "add_xp",
+    "add_xp_async",
     "check_level_up",
     "get_xp_progress",
     # Level Service
@@ -85,6 +88,7 @@ __all__ = [
     "use_streak_freeze",
     "add_streak_freeze",
     "get_streak_multiplier",
+    "get_streak_multiplier_decimal",
     "check_streak_badges",
     "get_streak_status",
     "calculate_streak_recovery_cost",
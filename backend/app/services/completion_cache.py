@@ -0,0 +1,37 @@
+"""
+Cache Redis des complétions du jour.
+
+La réponse de /completions/today est partagée entre les workers via
+Redis. Elle est supprimée à chaque écriture pour ce jour (complétion,
+annulation, rattrapage, suppression d'habitude); le TTL n'est qu'un
+filet de sécurité.
+"""
+from datetime import date
+from uuid import UUID
+
+import structlog
+from redis.exceptions import RedisError
+
+from app.utils.redis_client import get_redis
+
+logger = structlog.get_logger()
+
+TODAY_COMPLETIONS_TTL = 60
+
+
+def today_completions_key(user_id: UUID, day: date) -> str:
+    """Clé Redis de la réponse /completions/today d'un utilisateur pour ``day``."""
+    return f"completions:today:{user_id}:{day.isoformat()}"
+
+
+async def forget_today_completions(user_id: UUID, day: date) -> None:
+    """
+    Supprime la réponse en cache après une écriture pour ``day``.
+    
+    À appeler après le commit, pour qu'aucune requête ne remette en cache
+    l'ancien état entre-temps.
+    """
+    try:
+        await get_redis().delete(today_completions_key(user_id, day))
+    except RedisError as e:
+        logger.warning("Today completions cache not cleared", error=str(e))
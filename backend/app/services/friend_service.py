@@ -0,0 +1,96 @@
+"""
+Friend Service - Amitiés acceptées et cache des amis.
+
+La liste des amis d'un utilisateur est lue par le routeur des amis et
+par les classements. Elle est mise en cache quelques secondes dans Redis,
+partagé par tous les workers, et supprimée dès qu'une amitié entre deux
+utilisateurs est acceptée ou retirée.
+"""
+from uuid import UUID
+
+import orjson
+import structlog
+from redis.exceptions import RedisError
+from sqlalchemy import and_, case, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.friendship import Friendship
+from app.services.leaderboard_service import cached_boards_key
+from app.utils.redis_client import get_redis
+
+logger = structlog.get_logger()
+
+FRIEND_IDS_TTL = 5
+
+
+def accepted_friendship_filter(user_id: UUID):
+    """Clause WHERE des amitiés acceptées de ``user_id``."""
+    return and_(
+        or_(
+            Friendship.requester_id == user_id,
+            Friendship.addressee_id == user_id,
+        ),
+        Friendship.status == "accepted",
+    )
+
+
+def friend_ids_key(user_id: UUID) -> str:
+    """Clé Redis des IDs d'amis en cache de ``user_id``."""
+    return f"friends:ids:{user_id}"
+
+
+async def get_friend_ids(db: AsyncSession, user_id: UUID) -> list[UUID]:
+    """
+    Récupère les IDs des amis d'un utilisateur.
+    
+    Args:
+        db: Session de base de données
+        user_id: ID de l'utilisateur
+    
+    Returns:
+        IDs des amis (amitiés acceptées), depuis le cache si possible
+    """
+    redis = get_redis()
+    key = friend_ids_key(user_id)
+    
+    try:
+        cached = await redis.get(key)
+    except RedisError as e:
+        logger.warning("Friend ids cache unavailable", error=str(e))
+        cached = None
+    if cached is not None:
+        return [UUID(friend_id) for friend_id in orjson.loads(cached)]
+    
+    # L'autre côté de chaque amitié est choisi en SQL
+    result = await db.execute(
+        select(
+            case(
+                (Friendship.requester_id == user_id, Friendship.addressee_id),
+                else_=Friendship.requester_id,
+            )
+        ).where(accepted_friendship_filter(user_id))
+    )
+    friend_ids = list(result.scalars())
+    
+    try:
+        await redis.set(key, orjson.dumps(friend_ids), ex=FRIEND_IDS_TTL)
+    except RedisError as e:
+        logger.warning("Friend ids not cached", error=str(e))
+    
+    return friend_ids
+
+
+async def forget_friend_ids(*user_ids: UUID) -> None:
+    """
+    Invalide les amis et les classements en cache des utilisateurs donnés.
+    
+    À appeler après le commit du changement d'amitié, pour qu'aucune
+    requête ne remette en cache l'ancienne liste entre-temps.
+    """
+    keys = [friend_ids_key(user_id) for user_id in user_ids]
+    keys += [cached_boards_key(user_id) for user_id in user_ids]
+    
+    try:
+        await get_redis().delete(*keys)
+    except RedisError as e:
+        logger.warning("Friend ids cache not cleared", error=str(e))
@@ -465,3 +465,167 @@ async def cleanup_old_leaderboards(days_to_keep: int = 30) -> int:
         return deleted
     finally:
         await client.close()
+
+
+# Durée de vie des ensembles temporaires (amis, intersection) d'une lecture
+FRIENDS_BOARD_TTL = 60
+
+
+def weekly_xp_key(day: date) -> str:
+    """Clé du classement XP de la semaine ISO contenant ``day``."""
+    year, week, _ = day.isocalendar()
+    return _get_redis_key(TYPE_XP, PERIOD_WEEKLY, f"{year}-W{week:02d}")
+
+
+async def store_weekly_xp_scores(
+    client: redis.Redis,
+    week_start: date,
+    scores: dict[UUID, int]
+) -> None:
+    """
+    Remplace le classement XP hebdomadaire par les totaux des DailyStats.
+    
+    Reconstruire le sorted set entier (plutôt qu'un ZINCRBY) rend
+    l'opération idempotente: relancer l'agrégation d'un jour ne compte
+    pas son XP deux fois.
+    
+    Args:
+        client: Client Redis (celui du worker appelant)
+        week_start: Lundi de la semaine concernée
+        scores: XP de la semaine par utilisateur
+    """
+    key = weekly_xp_key(week_start)
+    
+    async with client.pipeline(transaction=True) as pipe:
+        pipe.delete(key)
+        if scores:
+            pipe.zadd(key, {str(user_id): xp for user_id, xp in scores.items()})
+        pipe.expire(key, 86400 * 14)  # 2 semaines
+        await pipe.execute()
+
+
+async def get_friends_weekly_xp(
+    client: redis.Redis,
+    user_id: UUID,
+    friend_ids: list[UUID],
+    week_start: date,
+    limit: int
+) -> Optional[tuple[list[tuple[UUID, float]], Optional[int]]]:
+    """
+    Classement XP hebdomadaire restreint aux amis, lu depuis Redis.
+    
+    Intersecte le classement de la semaine avec l'ensemble des amis
+    (ZINTERSTORE), puis lit le top et le rang de l'utilisateur: un seul
+    aller-retour via un pipeline.
+    
+    Args:
+        client: Client Redis partagé (réponses non décodées)
+        user_id: ID de l'utilisateur (inclus dans friend_ids)
+        friend_ids: IDs des amis, utilisateur compris
+        week_start: Lundi de la semaine courante
+        limit: Nombre d'entrées
+        
+    Returns:
+        (liste (user_id, xp) triée, rang 1-indexé de l'utilisateur), ou
+        None si le classement de la semaine n'a pas encore été construit
+    """
+    key = weekly_xp_key(week_start)
+    friends_key = f"{key}:friends:{user_id}"
+    board_key = f"{key}:board:{user_id}"
+    
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.exists(key)
+        pipe.delete(friends_key)
+        pipe.sadd(friends_key, *(str(friend_id) for friend_id in friend_ids))
+        pipe.expire(friends_key, FRIENDS_BOARD_TTL)
+        # Poids 0 sur l'ensemble: le score reste l'XP du classement
+        pipe.zinterstore(board_key, {key: 1, friends_key: 0})
+        pipe.expire(board_key, FRIENDS_BOARD_TTL)
+        pipe.zrevrange(board_key, 0, limit - 1, withscores=True)
+        pipe.zrevrank(board_key, str(user_id))
+        exists, *_, top, rank = await pipe.execute()
+    
+    if not exists:
+        return None
+    
+    rankings = [(UUID(member.decode()), score) for member, score in top]
+    return rankings, (rank + 1 if rank is not None else None)
+
+
+# Classements construits par l'API, mis en cache par utilisateur
+LEADERBOARD_CACHE_TTL = 60
+
+
+def cached_boards_key(user_id: UUID) -> str:
+    """Clé du hash des classements en cache vus par ``user_id``."""
+    return f"{LEADERBOARD_PREFIX}:cache:{user_id}"
+
+
+async def get_cached_board(
+    client: redis.Redis,
+    user_id: UUID,
+    board: str
+) -> Optional[bytes]:
+    """
+    Récupère un classement déjà sérialisé pour l'utilisateur.
+    
+    Args:
+        client: Client Redis partagé (réponses non décodées)
+        user_id: ID de l'utilisateur qui consulte le classement
+        board: Identifiant du classement (type, limite, période)
+        
+    Returns:
+        Le JSON du classement, ou None s'il n'est pas en cache
+    """
+    return await client.hget(cached_boards_key(user_id), board)
+
+
+async def store_cached_board(
+    client: redis.Redis,
+    user_id: UUID,
+    board: str,
+    payload: str
+) -> None:
+    """
+    Met en cache un classement sérialisé pour l'utilisateur.
+    
+    Tous les classements d'un utilisateur partagent un hash, qui expire
+    LEADERBOARD_CACHE_TTL secondes après sa création (EXPIRE NX): aucune
+    entrée n'est servie plus longtemps, et un seul DEL les invalide toutes.
+    
+    Args:
+        client: Client Redis partagé
+        user_id: ID de l'utilisateur qui consulte le classement
+        board: Identifiant du classement (type, limite, période)
+        payload: JSON du classement
+    """
+    key = cached_boards_key(user_id)
+    
+    async with client.pipeline(transaction=True) as pipe:
+        pipe.hset(key, board, payload)
+        pipe.expire(key, LEADERBOARD_CACHE_TTL, nx=True)
+        await pipe.execute()
+
+
+async def forget_all_cached_boards(client: redis.Redis) -> int:
+    """
+    Invalide tous les classements en cache (après reconstruction des scores).
+    
+    Returns:
+        Nombre de hashes supprimés
+    """
+    deleted = 0
+    keys = []
+    
+    async for key in client.scan_iter(
+        match=f"{LEADERBOARD_PREFIX}:cache:*", count=500
+    ):
+        keys.append(key)
+        if len(keys) >= 500:
+            deleted += await client.delete(*keys)
+            keys = []
+    
+    if keys:
+        deleted += await client.delete(*keys)
+    
+    return deleted
@@ -10,6 +10,7 @@ Récompenses par palier:
 - Paliers 5/10/25/50/100: récompenses spéciales
 """
 import math
+from functools import lru_cache
 from typing import Any
 
 # Coefficient de la formule XP
@@ -88,6 +89,7 @@ MILESTONE_REWARDS = {
 }
 
 
+@lru_cache(maxsize=256)
 def xp_for_level(level: int) -> int:
     """
     Calcule l'XP total requis pour atteindre un niveau donné.
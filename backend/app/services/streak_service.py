@@ -11,9 +11,11 @@ Mécaniques:
 - Multiplicateur XP: de x1.0 à x2.0 basé sur le streak
 """
 from datetime import date, datetime, timedelta
+from decimal import Decimal
+from functools import lru_cache
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import select
+from sqlalchemy import exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 if TYPE_CHECKING:
@@ -128,6 +130,7 @@ async def add_streak_freeze(db: AsyncSession, user: "User", amount: int = 1) ->
     return user.streak_freeze_available
 
 
+@lru_cache(maxsize=2048)
 def get_streak_multiplier(streak: int) -> float:
     """
     Calcule le multiplicateur d'XP basé sur le streak.
@@ -140,6 +143,12 @@ def get_streak_multiplier(streak: int) -> float:
     return min(STREAK_MULTIPLIER_MAX, multiplier)
 
 
+@lru_cache(maxsize=2048)
+def get_streak_multiplier_decimal(streak: int) -> Decimal:
+    """Multiplicateur de streak sous forme Decimal (colonne Numeric)."""
+    return Decimal(str(get_streak_multiplier(streak)))
+
+
 async def check_streak_badges(db: AsyncSession, user: "User") -> list["Badge"]:
     """
     Vérifie et débloque les badges de streak (async version).
@@ -164,13 +173,14 @@ async def check_streak_badges(db: AsyncSession, user: "User") -> list["Badge"]:
             badge = badge_result.scalar_one_or_none()
             
             if badge:
-                existing_result = await db.execute(
-                    select(UserBadge).where(
-                        UserBadge.user_id == user.id,
-                        UserBadge.badge_id == badge.id
+                existing = await db.scalar(
+                    select(
+                        exists().where(
+                            UserBadge.user_id == user.id,
+                            UserBadge.badge_id == badge.id
+                        )
                     )
                 )
-                existing = existing_result.scalar_one_or_none()
                 
                 if not existing:
                     # Débloquer le badge
@@ -9,12 +9,16 @@ Formules basées sur le CDC:
 """
 from datetime import datetime, time
 from decimal import Decimal
+from functools import lru_cache
 from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 if TYPE_CHECKING:
+    from app.models.transaction import XPTransaction
     from app.models.habit import Habit
     from app.models.task import Task
     from app.models.user import User
@@ -49,6 +53,24 @@ STREAK_MULTIPLIER_INCREMENT = 0.02  # +2% par jour de streak
 INTELLIGENCE_BONUS_PER_POINT = 0.005  # +0.5% par point
 
 
+# Difficulté implicite par catégorie d'habitude
+HABIT_CATEGORY_DIFFICULTY = {
+    "health": "medium",
+    "fitness": "hard",
+    "learning": "hard",
+    "mindfulness": "medium",
+    "social": "easy",
+    "productivity": "medium",
+    "creativity": "medium",
+    "general": "medium",
+}
+
+# Au-delà de ce streak le multiplicateur est plafonné (x2.0)
+STREAK_MULTIPLIER_SATURATION = round(
+    (STREAK_MULTIPLIER_MAX - STREAK_MULTIPLIER_MIN) / STREAK_MULTIPLIER_INCREMENT
+)
+
+
 def calculate_habit_xp(
     user: "User",
     habit: "Habit",
@@ -74,25 +96,24 @@ def calculate_habit_xp(
     if completion_time is None:
         completion_time = datetime.utcnow()
     
+    # Le streak n'a plus d'effet une fois le multiplicateur plafonné
+    streak = min(max(user.current_streak, 0), STREAK_MULTIPLIER_SATURATION)
+    intelligence = user.character.intelligence if user.character else 0
+    
+    return _habit_xp(habit.category, completion_time.hour, streak, intelligence)
+
+
+@lru_cache(maxsize=4096)
+def _habit_xp(category: str, hour: int, streak: int, intelligence: int) -> int:
+    """Cœur pur (et mémoïsé) de ``calculate_habit_xp``."""
     # XP de base - utilise la catégorie ou défaut "medium"
-    category_difficulty_map = {
-        "health": "medium",
-        "fitness": "hard",
-        "learning": "hard",
-        "mindfulness": "medium",
-        "social": "easy",
-        "productivity": "medium",
-        "creativity": "medium",
-        "general": "medium",
-    }
-    difficulty = category_difficulty_map.get(habit.category, "medium")
+    difficulty = HABIT_CATEGORY_DIFFICULTY.get(category, "medium")
     base_xp = HABIT_BASE_XP.get(difficulty, 15)
     
     # Si l'habitude est quantifiable, ajuster selon le ratio de complétion
     # (géré ailleurs, ici on assume complétion à 100%)
     
     # Bonus horaire: +10% si matinal (6h-9h) ou nocturne (22h-00h)
-    hour = completion_time.hour
     time_bonus = 0.0
     if 6 <= hour < 9:
         time_bonus = 0.10  # Early bird bonus
@@ -102,11 +123,10 @@ def calculate_habit_xp(
     xp = base_xp * (1 + time_bonus)
     
     # Appliquer le multiplicateur de streak
-    xp = apply_streak_multiplier(int(xp), user.current_streak)
+    xp = apply_streak_multiplier(int(xp), streak)
     
     # Appliquer le bonus d'intelligence
-    if user.character:
-        xp = apply_intelligence_bonus(xp, user.character.intelligence)
+    xp = apply_intelligence_bonus(xp, intelligence)
     
     return int(xp)
 
@@ -195,6 +215,33 @@ def apply_intelligence_bonus(xp: int, intelligence: int) -> int:
     return int(xp * bonus)
 
 
+def _apply_xp(
+    user: "User",
+    amount: int,
+    source_type: str,
+    source_id: Optional[UUID] = None,
+    description: Optional[str] = None
+) -> "XPTransaction":
+    """
+    Met à jour l'XP de l'utilisateur et construit la transaction d'audit.
+    
+    Ne touche pas à la session: l'appelant ajoute la transaction retournée.
+    """
+    from app.models.transaction import XPTransaction
+    
+    # Ajouter l'XP à l'utilisateur
+    user.total_xp = max(0, user.total_xp + amount)
+    
+    # Créer la transaction d'audit
+    return XPTransaction(
+        user_id=user.id,
+        amount=amount,
+        source_type=source_type,
+        source_id=source_id,
+        description=description,
+    )
+
+
 def add_xp(
     db: Session,
     user: "User",
@@ -202,11 +249,13 @@ def add_xp(
     source_type: str,
     source_id: Optional[UUID] = None,
     description: Optional[str] = None
-) -> None:
+) -> bool:
     """
     Ajoute de l'XP à un utilisateur et enregistre la transaction.
     
     Vérifie automatiquement si l'utilisateur monte de niveau après l'ajout.
+    Version synchrone pour les services utilisant une ``Session``; les
+    routers async utilisent ``add_xp_async``.
     
     Args:
         db: Session de base de données
@@ -215,30 +264,51 @@ def add_xp(
         source_type: Type de source (habit, task, combat, badge, streak, daily_bonus)
         source_id: ID optionnel de la source (habit_id, task_id, etc.)
         description: Description optionnelle de la transaction
+        
+    Returns:
+        True si l'utilisateur a monté de niveau
     """
-    from app.models.transaction import XPTransaction
+    db.add(_apply_xp(user, amount, source_type, source_id, description))
     
-    # Ajouter l'XP à l'utilisateur
-    user.total_xp = max(0, user.total_xp + amount)
+    # Vérifier level up (commit géré par le caller)
+    return check_level_up(db, user)
+
+
+async def add_xp_async(
+    db: AsyncSession,
+    user: "User",
+    amount: int,
+    source_type: str,
+    source_id: Optional[UUID] = None,
+    description: Optional[str] = None
+) -> bool:
+    """
+    Équivalent de ``add_xp`` pour une ``AsyncSession``.
     
-    # Créer la transaction d'audit
-    transaction = XPTransaction(
-        user_id=user.id,
-        amount=amount,
-        source_type=source_type,
-        source_id=source_id,
-        description=description,
-    )
-    db.add(transaction)
+    Le personnage est chargé explicitement avant la vérification du level
+    up, pour ne jamais déclencher de lazy load implicite (interdit en async).
+    
+    Args:
+        db: Session async de base de données
+        user: L'utilisateur qui reçoit l'XP
+        amount: Quantité d'XP à ajouter (peut être négatif pour pénalités)
+        source_type: Type de source (habit, task, combat, badge, streak, daily_bonus)
+        source_id: ID optionnel de la source (habit_id, task_id, etc.)
+        description: Description optionnelle de la transaction
+        
+    Returns:
+        True si l'utilisateur a monté de niveau
+    """
+    db.add(_apply_xp(user, amount, source_type, source_id, description))
     
-    # Vérifier level up
-    leveled_up = check_level_up(db, user)
+    if "character" in inspect(user).unloaded:
+        await db.refresh(user, attribute_names=["character"])
     
     # Commit géré par le caller
-    return leveled_up
+    return check_level_up(db, user)
 
 
-def check_level_up(db: Session, user: "User") -> bool:
+def check_level_up(db: Session | AsyncSession, user: "User") -> bool:
     """
     Vérifie si l'utilisateur doit monter de niveau et applique le changement.
     
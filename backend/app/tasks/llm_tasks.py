@@ -2,6 +2,7 @@
 Celery tasks for LLM-powered task evaluation.
 Now with rate limiting!
 """
+from collections import Counter
 from uuid import UUID
 
 import structlog
@@ -62,13 +63,13 @@ async def _get_user_context(session: AsyncSession, user: User) -> dict:
         if cat not in category_stats:
             category_stats[cat] = {
                 "category": cat,
-                "difficulties": [],
+                "difficulties": Counter(),
                 "xp_values": [],
                 "task_count": 0,
             }
         category_stats[cat]["task_count"] += 1
         if task.ai_difficulty:
-            category_stats[cat]["difficulties"].append(task.ai_difficulty)
+            category_stats[cat]["difficulties"][task.ai_difficulty] += 1
         if task.final_xp_reward:
             category_stats[cat]["xp_values"].append(task.final_xp_reward)
     
@@ -80,8 +81,7 @@ async def _get_user_context(session: AsyncSession, user: User) -> dict:
             stats["average_xp"] = 50
         
         if stats["difficulties"]:
-            from collections import Counter
-            stats["average_difficulty"] = Counter(stats["difficulties"]).most_common(1)[0][0]
+            stats["average_difficulty"] = stats["difficulties"].most_common(1)[0][0]
         else:
             stats["average_difficulty"] = "medium"
         
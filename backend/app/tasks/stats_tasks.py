@@ -7,18 +7,25 @@ from datetime import date, timedelta
 from decimal import Decimal
 from uuid import UUID
 
+import redis.asyncio as redis
 import structlog
 from celery import shared_task
+from redis.exceptions import RedisError
 from sqlalchemy import and_, func, select
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.models.completion import Completion
 from app.models.habit import Habit
 from app.models.stats import DailyStats
 from app.models.task import Task
 from app.models.transaction import CoinTransaction, XPTransaction
 from app.models.user import User
+from app.services.leaderboard_service import (
+    forget_all_cached_boards,
+    store_weekly_xp_scores,
+)
 from app.tasks.celery_utils import get_celery_db_session, run_async
 
 logger = structlog.get_logger()
@@ -149,6 +156,36 @@ async def _aggregate_user_daily_stats(
     return None
 
 
+async def _refresh_weekly_xp_leaderboard(
+    session: AsyncSession,
+    target_date: date,
+) -> None:
+    """Rebuild the Redis weekly XP board for the week of target_date.
+    
+    Leaderboards cached by the API were built from the old scores and
+    are dropped with it.
+    """
+    week_start = target_date - timedelta(days=target_date.weekday())
+    
+    result = await session.execute(
+        select(DailyStats.user_id, func.sum(DailyStats.xp_earned))
+        .where(
+            DailyStats.date >= week_start,
+            DailyStats.date < week_start + timedelta(days=7),
+        )
+        .group_by(DailyStats.user_id)
+    )
+    scores = {user_id: int(xp or 0) for user_id, xp in result}
+    
+    # Own client: the shared one is bound to the API's event loop
+    client = redis.from_url(get_settings().redis_url)
+    try:
+        await store_weekly_xp_scores(client, week_start, scores)
+        await forget_all_cached_boards(client)
+    finally:
+        await client.aclose()
+
+
 async def _aggregate_daily_stats_async(target_date: date | None = None) -> dict:
     """Aggregate daily stats for all users."""
     if target_date is None:
@@ -161,7 +198,7 @@ async def _aggregate_daily_stats_async(target_date: date | None = None) -> dict:
         # Get all active users
         users_query = select(User.id).where(User.deleted_at.is_(None))
         result = await session.execute(users_query)
-        user_ids = [row[0] for row in result.fetchall()]
+        user_ids = result.scalars().all()
         
         log.info("processing_users", user_count=len(user_ids))
         
@@ -182,6 +219,11 @@ async def _aggregate_daily_stats_async(target_date: date | None = None) -> dict:
         
         await session.commit()
         
+        try:
+            await _refresh_weekly_xp_leaderboard(session, target_date)
+        except RedisError as e:
+            log.warning("weekly_leaderboard_refresh_failed", error=str(e))
+        
         log.info(
             "aggregation_completed",
             success_count=success_count,
@@ -8,6 +8,9 @@ from app.utils.security import (
     verify_token,
     verify_refresh_token,
 )
+from app.utils.cache import LRUCache
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.redis_client import close_redis, get_redis
 from app.utils.dependencies import (
     get_db,
     get_current_user,
@@ -15,6 +18,8 @@ from app.utils.dependencies import (
     get_optional_user,
     require_admin,
     DatabaseSession,
+    Now,
+    RequestClock,
     CurrentUser,
     CurrentActiveUser,
     OptionalUser,
@@ -29,6 +34,14 @@ __all__ = [
     "verify_password",
     "verify_token",
     "verify_refresh_token",
+    # Cache
+    "LRUCache",
+    # Pagination
+    "encode_cursor",
+    "decode_cursor",
+    # Redis
+    "get_redis",
+    "close_redis",
     # Dependencies
     "get_db",
     "get_current_user",
@@ -36,6 +49,8 @@ __all__ = [
     "get_optional_user",
     "require_admin",
     "DatabaseSession",
+    "Now",
+    "RequestClock",
     "CurrentUser",
     "CurrentActiveUser",
     "OptionalUser",
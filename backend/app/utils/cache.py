@@ -0,0 +1,57 @@
+"""Small in-process caches for hot, read-heavy code paths."""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LRUCache:
+    """Bounded LRU cache with an optional per-entry time-to-live.
+
+    Entries are evicted least-recently-used first once ``maxsize`` is
+    reached. When ``ttl`` is set, entries older than ``ttl`` seconds are
+    treated as missing.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key``, or ``default`` on a miss."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        stored_at, value = entry
+        if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store ``value`` under ``key``, evicting the oldest entry if full."""
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Drop ``key`` from the cache if present."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_MISSING = object()
@@ -1,6 +1,7 @@
 """FastAPI dependencies for authentication and database access."""
 
-from typing import Annotated
+from datetime import date, datetime, timezone
+from typing import Annotated, NamedTuple
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
@@ -38,6 +39,27 @@ async def get_db() -> AsyncSession:
 DatabaseSession = Annotated[AsyncSession, Depends(get_db)]
 
 
+class RequestClock(NamedTuple):
+    """Wall-clock time read once for the whole request."""
+    
+    now: datetime  # timezone-aware, UTC
+    today: date  # server-local date, same as date.today()
+
+
+async def get_request_clock() -> RequestClock:
+    """Dependency reading the clock once per request.
+    
+    Async so FastAPI runs it inline rather than in the threadpool; also the
+    single place to freeze time in tests.
+    """
+    now = datetime.now(timezone.utc)
+    return RequestClock(now=now, today=now.astimezone().date())
+
+
+# Type alias for the request clock dependency
+Now = Annotated[RequestClock, Depends(get_request_clock)]
+
+
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
     db: DatabaseSession,
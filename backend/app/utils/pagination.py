@@ -0,0 +1,36 @@
+"""Opaque keyset-pagination cursors.
+
+A cursor encodes the ``(created_at, id)`` of the last row of a page, so the
+next page can seek with ``WHERE (created_at, id) < (:ts, :id)`` instead of
+skipping rows with OFFSET.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Encode the position of a row as an opaque URL-safe cursor."""
+    payload = json.dumps({"ts": created_at.isoformat(), "id": str(row_id)})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor produced by ``encode_cursor``.
+    
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(payload["ts"]), UUID(payload["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
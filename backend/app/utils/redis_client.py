@@ -0,0 +1,34 @@
+"""Shared Redis client for request handlers."""
+
+from functools import lru_cache
+
+import redis.asyncio as redis
+
+from app.config import get_settings
+
+
+@lru_cache
+def get_redis() -> redis.Redis:
+    """Process-wide Redis client.
+    
+    Its connection pool is reused across requests, so callers skip the
+    connect/auth handshake and no per-call PING is needed: idle pooled
+    connections are re-checked by the health check interval. Short
+    timeouts keep a dead broker from stalling callers.
+    """
+    settings = get_settings()
+    return redis.from_url(
+        settings.redis_url,
+        max_connections=32,
+        socket_connect_timeout=1.0,
+        socket_timeout=1.0,
+        retry_on_timeout=True,
+        health_check_interval=30,
+    )
+
+
+async def close_redis() -> None:
+    """Close the shared client's connections (application shutdown)."""
+    if get_redis.cache_info().currsize:
+        await get_redis().aclose()
+        get_redis.cache_clear()
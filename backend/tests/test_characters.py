@@ -49,3 +49,19 @@ class TestCharacters:
         )
         
         assert response.status_code == 400
+
+    def test_get_my_character_reflects_update(self, client: httpx.Client, test_user_with_character):
+        """Test cached character response picks up a rename."""
+        headers = test_user_with_character["headers"]
+        client.get("/api/characters/me", headers=headers)
+        
+        response = client.put(
+            "/api/characters/me",
+            json={"name": "Renamed"},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        
+        response = client.get("/api/characters/me", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["name"] == "Renamed"
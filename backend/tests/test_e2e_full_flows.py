@@ -422,6 +422,40 @@ class TestShopInventoryFlow:
         unequip = client.post(f"/api/inventory/unequip/{category}", headers=headers)
         assert unequip.status_code == 200
 
+    def test_equip_and_unequip_helmet(self, client):
+        """Helmet slot: equip then unequip from the character's helmet field."""
+        headers = self._create_rich_user(client)
+        
+        shop = client.get("/api/shop/items?category=helmet", headers=headers)
+        affordable = [
+            i for i in shop.json()["items"]
+            if i["can_afford"] and not i["is_owned"]
+        ]
+        
+        if not affordable:
+            pytest.skip("No affordable helmet to purchase")
+        
+        item_id = affordable[0]["id"]
+        purchase = client.post(f"/api/shop/buy/{item_id}", headers=headers)
+        assert purchase.status_code == 200, f"Purchase failed: {purchase.text}"
+        
+        inventory = client.get("/api/inventory/?category=helmet", headers=headers)
+        entry = next(i for i in inventory.json()["items"] if i["item_id"] == item_id)
+        
+        equip = client.post(f"/api/inventory/equip/{entry['id']}", headers=headers)
+        assert equip.status_code == 200, f"Equip failed: {equip.text}"
+        assert equip.json()["equipped_item"]["equipped_slot"] == "helmet"
+        
+        equipped = client.get("/api/inventory/equipped", headers=headers)
+        assert equipped.json()["helmet"]["item_id"] == item_id
+        
+        unequip = client.post("/api/inventory/unequip/helmet", headers=headers)
+        assert unequip.status_code == 200, f"Unequip failed: {unequip.text}"
+        assert unequip.json()["unequipped_item"]["item_id"] == item_id
+        
+        equipped = client.get("/api/inventory/equipped", headers=headers)
+        assert equipped.json()["helmet"] is None
+
     def test_cannot_buy_without_coins(self, client):
         """Verify purchase fails without enough coins."""
         email = f"poor-{uuid4().hex[:8]}@test.com"
@@ -27,6 +27,16 @@ class TestFriendsList:
         assert "friends" in data
         assert data["friends"] == []
         assert data["total"] == 0
+        assert data["next_cursor"] is None
+    
+    def test_get_friends_invalid_cursor(self, client, test_user):
+        """Test that a malformed pagination cursor is rejected."""
+        response = client.get(
+            "/api/friends/",
+            params={"cursor": "not-a-cursor"},
+            headers=test_user["headers"],
+        )
+        assert response.status_code == 400
     
     def test_get_friends_unauthorized(self, client):
         """Test getting friends without auth."""
@@ -84,6 +94,17 @@ class TestFriendRequests:
         assert data["outgoing"] == []
         assert data["incoming_count"] == 0
         assert data["outgoing_count"] == 0
+        assert data["incoming_next_cursor"] is None
+        assert data["outgoing_next_cursor"] is None
+    
+    def test_get_pending_requests_limit_capped(self, client, test_user):
+        """Test that the page size is capped server-side."""
+        response = client.get(
+            "/api/friends/pending",
+            params={"limit": 1000},
+            headers=test_user["headers"],
+        )
+        assert response.status_code == 422
 
 
 class TestFriendRequestFlow:
@@ -137,8 +158,14 @@ class TestFriendRequestFlow:
         assert friends_response.status_code == 200
         friends = friends_response.json()
         assert friends["total"] == 1
+        assert friends["online_count"] == 0
         
-        friend_user_id = friends["friends"][0]["user_id"]
+        friend = friends["friends"][0]
+        assert friend["username"] == second_user_data["username"]
+        assert friend["is_online"] is False
+        assert friend["friendship_id"] == friendship_id
+        assert "friends_since" in friend
+        friend_user_id = friend["user_id"]
         
         # 6. Remove friend
         remove_response = client.delete(
@@ -186,6 +213,44 @@ class TestFriendRequestFlow:
         # Verify not in friends list
         friends_response = client.get("/api/friends/", headers=second_headers)
         assert friends_response.json()["total"] == 0
+    
+    def test_request_after_reject(self, client, test_user):
+        """Test that a rejected pair can send a new request either way."""
+        unique = uuid4().hex[:8]
+        register_response = client.post("/api/auth/register", json={
+            "email": f"rerequest_{unique}@test.com",
+            "username": f"Rerequest_{unique}",
+            "password": "RerequestPass123!",
+        })
+        assert register_response.status_code in [200, 201]
+        second_headers = {
+            "Authorization": f"Bearer {register_response.json()['access_token']}"
+        }
+        
+        # First user -> second user, rejected
+        second_code = client.get("/api/friends/code", headers=second_headers).json()["friend_code"]
+        client.post(f"/api/friends/code/{second_code}", headers=test_user["headers"])
+        pending = client.get("/api/friends/pending", headers=second_headers).json()
+        friendship_id = pending["incoming"][0]["id"]
+        client.post(f"/api/friends/reject/{friendship_id}", headers=second_headers)
+        
+        # Second user now asks the first user
+        first_code = client.get("/api/friends/code", headers=test_user["headers"]).json()["friend_code"]
+        response = client.post(f"/api/friends/code/{first_code}", headers=second_headers)
+        assert response.status_code == 201
+        assert response.json()["status"] == "pending"
+        
+        pending = client.get("/api/friends/pending", headers=test_user["headers"]).json()
+        assert pending["incoming_count"] == 1
+        
+        accept_response = client.post(
+            f"/api/friends/accept/{pending['incoming'][0]['id']}",
+            headers=test_user["headers"],
+        )
+        assert accept_response.status_code == 200
+        
+        friends_response = client.get("/api/friends/", headers=second_headers)
+        assert friends_response.json()["total"] == 1
 
 
 class TestPublicProfile:
@@ -1,6 +1,42 @@
 """Tests for habits endpoints."""
+from datetime import datetime, timezone
+from uuid import uuid4
+
 import httpx
 
+from app.models.habit import Habit
+from app.routers.habits import habit_to_response
+from app.schemas.habit import HabitResponse
+
+
+class TestHabitToResponse:
+    """Test the unvalidated HabitResponse builder against the schema."""
+    
+    def test_round_trips_through_validation(self):
+        now = datetime(2024, 2, 15, 12, 0, 0, tzinfo=timezone.utc)
+        habit = Habit(
+            id=uuid4(),
+            user_id=uuid4(),
+            name="Read",
+            description=None,
+            icon="📚",
+            color="#6366f1",
+            frequency_type="specific_days",
+            frequency_days=[0, 2, 4],
+            frequency_count=None,
+            reminder_time=None,
+            current_streak=3,
+            best_streak=5,
+            total_completions=12,
+            is_archived=False,
+            created_at=now,
+            updated_at=now,
+        )
+        
+        response = habit_to_response(habit, completed_today=True)
+        
+        assert HabitResponse.model_validate(response.model_dump()) == response
+
 
 class TestHabits:
     """Test habit CRUD operations."""
@@ -76,3 +112,21 @@ class TestHabits:
         )
         
         assert response.status_code == 204
+
+    def test_delete_habit_with_completions(self, client: httpx.Client, test_user_with_character):
+        """Test deleting a habit that already has completions."""
+        headers = test_user_with_character["headers"]
+        create_response = client.post(
+            "/api/habits/",
+            json={"title": "Completed Then Deleted", "frequency": "daily"},
+            headers=headers,
+        )
+        habit_id = create_response.json()["id"]
+        
+        client.post("/api/completions/", json={"habit_id": habit_id}, headers=headers)
+        
+        response = client.delete(f"/api/habits/{habit_id}", headers=headers)
+        assert response.status_code == 204
+        
+        response = client.get(f"/api/habits/{habit_id}/history", headers=headers)
+        assert response.status_code == 404